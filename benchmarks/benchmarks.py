@@ -0,0 +1,125 @@
+"""Benchmarks for tabipy, in the format used by airspeed velocity (asv).
+
+Run them with ``asv run``, or without asv with ``python -m benchmarks.run``,
+which also records peak memory and compares results against a baseline.
+"""
+import warnings
+from tabipy import Table, TableHeaderRow
+
+WIDTH = 10 # Columns in every benchmark table
+SIZES = [100, 10000, 1000000] # Cells
+
+def make_values(n_cells):
+    "Rows of plain values, n_cells in total."
+    nrows = max(n_cells // WIDTH, 1)
+    return [tuple(range(r * WIDTH, (r + 1) * WIDTH)) for r in range(nrows)]
+
+def make_rows(n_cells, row_kind):
+    rows = make_values(n_cells)
+    if row_kind == 'header':
+        rows = [TableHeaderRow(*r) for r in rows]
+    return rows
+
+def make_table(n_cells, layout='dense', row_kind='body'):
+    """Make a table for benchmarking.
+
+    layout is 'dense' for no spans, or 'spans' for a row span and a column
+    span in every fourth row. row_kind is 'body' or 'header'."""
+    table = Table(*make_rows(n_cells, row_kind))
+    if layout == 'spans':
+        for r in range(0, len(table.rows) - 1, 4):
+            table.cell(r, 0).row_span = 2
+            table.cell(r, 2).col_span = 3
+    return table
+
+class Construction(object):
+    params = (SIZES, ['body', 'header'])
+    param_names = ['n_cells', 'row_kind']
+
+    def setup(self, n_cells, row_kind):
+        self.values = make_values(n_cells)
+        self.row_kind = row_kind
+
+    def _rows(self):
+        if self.row_kind == 'header':
+            return [TableHeaderRow(*r) for r in self.values]
+        return self.values
+
+    def time_init(self, n_cells, row_kind):
+        Table(*self._rows())
+
+    def time_append_row(self, n_cells, row_kind):
+        table = Table()
+        for r in self._rows():
+            table.append_row(r)
+
+    def time_extend_rows(self, n_cells, row_kind):
+        Table().extend_rows(self._rows())
+
+    def peakmem_init(self, n_cells, row_kind):
+        Table(*self._rows())
+
+class CellAccess(object):
+    params = (SIZES, ['dense', 'spans'])
+    param_names = ['n_cells', 'layout']
+
+    def setup(self, n_cells, layout):
+        self.table = make_table(n_cells, layout)
+
+    def time_cell(self, n_cells, layout):
+        cell = self.table.cell
+        for r in range(len(self.table.rows)):
+            cell(r, WIDTH // 2)
+
+class Render(object):
+    params = (SIZES, ['dense', 'spans'], ['body', 'header'])
+    param_names = ['n_cells', 'layout', 'row_kind']
+
+    def setup(self, n_cells, layout, row_kind):
+        # Cells with row spans warn about the multirow package; the filters
+        # are put back as they were in teardown
+        self.warnings = warnings.catch_warnings()
+        self.warnings.__enter__()
+        warnings.simplefilter('ignore')
+        self.table = make_table(n_cells, layout, row_kind)
+        # Measure rendering, not the render cache
+        self.table.cache_renders = False
+
+    def teardown(self, n_cells, layout, row_kind):
+        self.warnings.__exit__()
+
+    def time_layout(self, n_cells, layout, row_kind):
+        self.table._layout = None
+        self.table._get_layout()
+
+    def time_repr_html(self, n_cells, layout, row_kind):
+        ''.join(self.table.iter_html())
+
+    def time_repr_latex(self, n_cells, layout, row_kind):
+        self.table._repr_latex_()
+
+    def peakmem_repr_html(self, n_cells, layout, row_kind):
+        ''.join(self.table.iter_html())
+
+    def peakmem_repr_latex(self, n_cells, layout, row_kind):
+        self.table._repr_latex_()
+
+class RenderCached(object):
+    params = (SIZES, ['dense', 'spans'])
+    param_names = ['n_cells', 'layout']
+
+    def setup(self, n_cells, layout):
+        self.warnings = warnings.catch_warnings()
+        self.warnings.__enter__()
+        warnings.simplefilter('ignore')
+        self.table = make_table(n_cells, layout)
+        self.table.max_rows = None
+        self.table._repr_html_()
+
+    def teardown(self, n_cells, layout):
+        self.warnings.__exit__()
+
+    def time_repr_html_one_edit(self, n_cells, layout):
+        cell = self.table.cell(len(self.table.rows) // 2, 1)
+        cell.value = cell.value
+        self.table._repr_html_()
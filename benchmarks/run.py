@@ -0,0 +1,111 @@
+"""Run the benchmarks without asv, recording wall time and peak memory.
+
+    python -m benchmarks.run [--max-cells N] [--filter TEXT]
+                             [--save FILE] [--compare FILE]
+
+Results are printed and, with --save, written as JSON. With --compare, they
+are checked against results saved earlier, and the exit status is 1 if any
+benchmark got slower or used more memory by more than --threshold.
+
+Peak memory is measured with tracemalloc, so it covers memory allocated by
+Python rather than the whole process.
+"""
+from __future__ import print_function
+import argparse
+import inspect
+import itertools
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+
+from . import benchmarks
+
+def iter_benchmarks(max_cells, pattern):
+    "Yield (name, class, method name, params) for each benchmark to run."
+    for cls_name, cls in sorted(vars(benchmarks).items()):
+        if not (inspect.isclass(cls) and hasattr(cls, 'params')):
+            continue
+        for method in sorted(vars(cls)):
+            if not method.startswith(('time_', 'peakmem_')):
+                continue
+            for params in itertools.product(*cls.params):
+                if params[0] > max_cells:
+                    continue
+                name = '%s.%s%r' % (cls_name, method, params)
+                if pattern in name:
+                    yield name, cls, method, params
+
+def measure(cls, method, params, repeat):
+    "Run one benchmark, returning its result as a dict."
+    bench = cls()
+    bench.setup(*params)
+    func = getattr(bench, method)
+    try:
+        if method.startswith('peakmem_'):
+            tracemalloc.start()
+            try:
+                func(*params)
+                return {'peak_memory': tracemalloc.get_traced_memory()[1]}
+            finally:
+                tracemalloc.stop()
+        timer = timeit.Timer(lambda: func(*params))
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        return {'time': best}
+    finally:
+        if hasattr(bench, 'teardown'):
+            bench.teardown(*params)
+
+def compare(results, baseline, threshold):
+    "Print changes against a baseline and return the names of regressions."
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        for key, value in results[name].items():
+            old = baseline[name].get(key)
+            if not old:
+                continue
+            ratio = value / float(old)
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  REGRESSION'
+                regressions.append(name)
+            print('%-70s %-11s %6.2fx%s' % (name, key, ratio, flag))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-cells', type=int, default=10000,
+                        help='largest table size to run (default %(default)s)')
+    parser.add_argument('--filter', default='',
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='compare with this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fractional slowdown counted as a regression')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, cls, method, params in iter_benchmarks(args.max_cells,
+                                                     args.filter):
+        results[name] = result = measure(cls, method, params, args.repeat)
+        print('%-70s %s' % (name, ', '.join('%s=%.6g' % item
+                                            for item in result.items())))
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(),
+                       'machine': platform.machine(),
+                       'results': results}, f, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,108 @@
+import json
+import pickle
 import re
+import struct
 import sys
+import threading
+import time
 import warnings
-from collections import OrderedDict as Dict
+from array import array
+from collections import OrderedDict as Dict, namedtuple
 PY3 = sys.version_info[0] >= 3
 
+from itertools import chain, count, repeat
 try:
     from itertools import zip_longest  # Python 3
 except ImportError:
     from itertools import izip_longest as zip_longest  # Python 2
-from collections import Mapping
+try:
+    from collections.abc import Mapping, MutableSequence, Sequence  # Python 3
+except ImportError:
+    from collections import Mapping, MutableSequence, Sequence  # Python 2
+from numbers import Number
+
+RenderCacheInfo = namedtuple('RenderCacheInfo', 'hits misses cached_rows')
+MemoryUsage = namedtuple('MemoryUsage', 'rows cells placeholders styles values '
+                         'layout rendered total')
+RenderStats = namedtuple('RenderStats', 'renders rows cells spans bytes '
+                         'cache_hits cache_misses layout format escape assemble')
+_clock = getattr(time, 'perf_counter', time.time)
+
+class _CellStyle(tuple):
+    """Immutable (header, bg_colour, text_colour) record shared between cells.
+
+    Use _CellStyle.get() rather than the constructor, so that cells with the
+    same styling refer to the same object."""
+    __slots__ = ()
+    _registry = {}
+    # Class names for compact HTML, by (bg_colour, text_colour)
+    _class_names = {}
+
+    @classmethod
+    def get(cls, header=False, bg_colour=None, text_colour=None):
+        key = (bool(header), bg_colour, text_colour)
+        style = cls._registry.get(key)
+        if style is None:
+            style = cls._registry[key] = tuple.__new__(cls, key)
+        return style
+
+    header = property(lambda self: self[0])
+    bg_colour = property(lambda self: self[1])
+    text_colour = property(lambda self: self[2])
+
+    def replace(self, **kwargs):
+        "Return the shared style with some of the fields changed."
+        fields = dict(header=self[0], bg_colour=self[1], text_colour=self[2])
+        fields.update(kwargs)
+        return self.get(**fields)
+
+    def css(self, sep='; '):
+        "The CSS declarations for the colours, or '' if there are none."
+        rules = []
+        if self[1]:
+            rules.append('background-color:%s' % self[1])
+        if self[2]:
+            rules.append('color:%s' % self[2])
+        return sep.join(rules)
+
+    def css_class(self):
+        """The class name used for these colours in compact HTML.
+
+        Names are made from the colours themselves, so they are the same in
+        every table and process. Styles with the same colours share a name,
+        whatever the header flag."""
+        key = self[1:]
+        name = self._class_names.get(key)
+        if name is None:
+            parts = []
+            if self[1]:
+                parts.append(_css_ident('b', self[1]))
+            if self[2]:
+                parts.append(_css_ident('t', self[2]))
+            name = self._class_names[key] = '-'.join(parts)
+        return name
+
+def _css_ident(prefix, colour):
+    """Spell a colour after a prefix with the characters allowed in a CSS
+    class name. A leading # is shown by capitalising the prefix, and other
+    characters are written as _<hex code>_, so that different colours always
+    get different names."""
+    colour = '%s' % (colour,)
+    if colour.startswith('#'):
+        prefix, colour = prefix.upper(), colour[1:]
+    return prefix + re.sub('[^A-Za-z0-9]', lambda m: '_%x_' % ord(m.group()),
+                           colour)
 
 class TableCell(object):
-    bg_colour = None
+    """A single table cell.
+
+    Cells use __slots__, and the header flag and colours live in a
+    _CellStyle record shared by every cell with the same styling. On 64-bit
+    CPython this keeps a cell to 80 bytes (see _MEMORY_BUDGET), not counting
+    the value it holds.
+    """
+    __slots__ = ('_value', '_style', '_row_span', '_col_span', '_row')
+    _MEMORY_BUDGET = 80 # bytes per cell, as reported by sys.getsizeof
     _latex_escape_table = {'&': r'\&',
                            '\\': r'{\textbackslash}',
                            '~': r'{\textasciitilde}',
@@ -22,22 +113,19 @@ class TableCell(object):
                            '_': r'\_',
                            '{': '\{',
                            '}': '\}'}
-    _latex_escape_re = None
+    # regex for escaping to latex code, longest matches first
+    _latex_escape_re = re.compile('|'.join(map(re.escape,
+                                        sorted(_latex_escape_table.keys(),
+                                               key=len, reverse=True))))
     
     def __init__(self, value, header=False, bg_colour=None, text_colour=None,
                  row_span=1, col_span=1):
-        self.value = value
-        self.header = header
-        self.bg_colour = bg_colour
-        self.text_colour = text_colour
+        self._row = None # The TableRow this cell was appended to
+        self._value = value
+        self._style = _CellStyle.get(header, bg_colour, text_colour)
         self.row_span = row_span
         self.col_span = col_span
-        self._suppress = False
-        # initialize regex for escaping to latex code
-        if self._latex_escape_re is None:
-            self._latex_escape_re = re.compile('|'.join(map(re.escape, 
-                                        sorted(self._latex_escape_table.keys(),
-                                               key=len, reverse=True))))
+
     def _defaults_(self):
         defaults = Dict([('value',('','self.value')),
                          ('header',(False,'self.header')),
@@ -47,9 +135,10 @@ class TableCell(object):
                          ('col_span',(1,'self.col_span'))])
         return defaults
     
-    def _latex_escape_func(self, match): 
+    @staticmethod
+    def _latex_escape_func(match): 
         """Replace regex match with latex equivalent"""
-        return self._latex_escape_table[match.group()]
+        return TableCell._latex_escape_table[match.group()]
         
     def __repr__(self):
         val = "'%s'"%self.value if type(self.value)==str else self.value
@@ -65,13 +154,50 @@ class TableCell(object):
         return text
     
     def _make_css(self):
-        rules = []
-        if self.bg_colour:
-            rules.append('background-color:%s' % self.bg_colour)
-        if self.text_colour:
-            rules.append('color:%s' % self.text_colour)
-        return '; '.join(rules)
+        return self._style.css()
         
+    def _changed(self):
+        "Tell the row this cell belongs to that its rendering is out of date."
+        if self._row is not None:
+            self._row._cells_changed()
+
+    def _spans_changed(self):
+        "Tell the row this cell belongs to that a span changed."
+        if self._row is not None:
+            self._row._spans_changed()
+
+    @property
+    def value(self):
+        return self._value
+    @value.setter
+    def value(self, val):
+        self._value = val
+        self._changed()
+
+    @property
+    def header(self):
+        return self._style.header
+    @header.setter
+    def header(self, val):
+        self._style = self._style.replace(header=val)
+        self._changed()
+
+    @property
+    def bg_colour(self):
+        return self._style.bg_colour
+    @bg_colour.setter
+    def bg_colour(self, val):
+        self._style = self._style.replace(bg_colour=val)
+        self._changed()
+
+    @property
+    def text_colour(self):
+        return self._style.text_colour
+    @text_colour.setter
+    def text_colour(self, val):
+        self._style = self._style.replace(text_colour=val)
+        self._changed()
+
     def _check_span(self,val):
         "Validate the span value."
         val = int(val)
@@ -87,6 +213,7 @@ class TableCell(object):
     def row_span(self,val):
         val = self._check_span(val)
         self._row_span = val
+        self._spans_changed()
         
     @property
     def col_span(self):
@@ -95,56 +222,418 @@ class TableCell(object):
     def col_span(self,val):
         val = self._check_span(val)
         self._col_span = val
+        self._spans_changed()
     
     def _repr_html_(self):
-        tag = 'th' if self.header else 'td'
-        spans = ''
-        if self.col_span>1:
-            spans += 'colspan="%s" '%self.col_span
-        if self.row_span>1:
-            spans += 'rowspan="%s"'%self.row_span
-        attrs = []
-        style = self._make_css()
-        if style:
-            attrs.append('style="%s"'%style)
-        return "<%s %s %s>%s</%s>"% (tag, spans,' '.join(attrs), self.value, 
-                                     tag)
+        return self._html(self._row_span, self._col_span, self._value)
+
+    def _html(self, row_span, col_span, value, compact=False):
+        """Render the cell as HTML with the given spans and displayed value.
+
+        In compact mode, colours are given by a class from
+        _CellStyle.css_class() and there is no padding whitespace."""
+        return _cell_html(self._style, row_span, col_span, value, compact)
 
     def _repr_latex_(self):
-        out = (str if PY3 else unicode)(self.value)
-        out = self._latex_escape_re.sub(self._latex_escape_func, out)
+        return self._latex(self._row_span, self._col_span,
+                           _latex_escape(self._value))
+
+    def _latex(self, row_span, col_span, out):
+        """Render the cell as LaTeX with the given spans, from the displayed
+        value already escaped."""
         # the bolf flag must only be next to the value of the cell not outside
         # of the multicolumn flag
-        if self._suppress: # For hiding cell content when using multicolumn
-            out = ''
-        elif self.header:
+        if self.header:
             out = u"\\bf " + out
-        if self.row_span>1:
-            warn_txt = ('Must use multirow package in the .tex file, \n e.g.'
-            r' "\usepackage{multirow} % to support multiple rows"')
-            warnings.warn(warn_txt)
-            text_row = "\multirow{%d}{*}{%s}"%(self.row_span,out)  
+        if row_span>1:
+            # Tables warn about the multirow package once per render
+            text_row = "\multirow{%d}{*}{%s}"%(row_span,out)  
         else:
             text_row = out
-        if self.col_span>1:
-            text = "\multicolumn{%d}{l}{%s}"%(self.col_span, text_row)
+        if col_span>1:
+            text = "\multicolumn{%d}{l}{%s}"%(col_span, text_row)
         else:
             text = text_row    
 #         text = "\multicolumn{%d}{l}{%s}"%(self.col_span, text_row)
         return text
 
+def _cell_html(style, row_span, col_span, value, compact=False):
+    """Render a cell with the given style as HTML, with the given spans and
+    displayed value; see TableCell._html()."""
+    tag = 'th' if style[0] else 'td'
+    if compact:
+        attrs = ''
+        if col_span>1:
+            attrs += ' colspan="%d"' % col_span
+        if row_span>1:
+            attrs += ' rowspan="%d"' % row_span
+        if style[1] or style[2]:
+            attrs += ' class="%s"' % style.css_class()
+        return "<%s%s>%s</%s>" % (tag, attrs, value, tag)
+    spans = ''
+    if col_span>1:
+        spans += 'colspan="%s" '%col_span
+    if row_span>1:
+        spans += 'rowspan="%s"'%row_span
+    attrs = []
+    css = style.css()
+    if css:
+        attrs.append('style="%s"'%css)
+    return "<%s %s %s>%s</%s>"% (tag, spans,' '.join(attrs), value, tag)
+
+_NOT_EVALUATED = object()
+
+def _repr_parts(value):
+    """Generate repr(value) in parts, going into lists, tuples, sets and
+    dicts, so that building the text can be stopped part way."""
+    t = type(value)
+    if t is dict:
+        yield '{'
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                yield ', '
+            for part in _repr_parts(key):
+                yield part
+            yield ': '
+            for part in _repr_parts(item):
+                yield part
+        yield '}'
+    elif value and t in _repr_brackets:
+        start, end = _repr_brackets[t]
+        yield start
+        for i, item in enumerate(value):
+            if i:
+                yield ', '
+            for part in _repr_parts(item):
+                yield part
+        yield ',' + end if t is tuple and len(value) == 1 else end
+    else:
+        yield repr(value)
+
+_repr_brackets = {list: ('[', ']'), tuple: ('(', ')'), set: ('{', '}'),
+                  frozenset: ('frozenset({', '})')}
+
+def _limited_text(value, max_chars):
+    """Convert value to text, cut to max_chars characters followed by '...'
+    if it's longer. None for no limit."""
+    if max_chars is None:
+        return '%s' % (value,)
+    if type(value) is dict or type(value) in _repr_brackets:
+        parts = []
+        length = 0
+        for part in _repr_parts(value):
+            parts.append(part)
+            length += len(part)
+            if length > max_chars:
+                break
+        text = ''.join(parts)
+    else:
+        text = '%s' % (value,)
+    if len(text) > max_chars:
+        text = text[:max_chars] + '...'
+    return text
+
+class Deferred(object):
+    """A value worked out when it is first displayed, for use in a table
+    cell in place of the value.
+
+    func is called with no arguments the first time the value is rendered,
+    and the result is kept. Only cells that are rendered are worked out, so
+    a page or the display view of a large table only computes what it shows.
+
+    The text shown is cut to max_chars characters (followed by '...'), and
+    lists, tuples, sets and dicts are only converted to text as far as
+    needed for that. It defaults to the class attribute; None shows all of
+    it. Formatters set with Table.set_format() are given the value itself,
+    as are sort_by(), filter(), index() and style rules, which work out the
+    values they look at. Table.to_bytes() saves the value, not func.
+    """
+    max_chars = 1000
+
+    def __init__(self, func, **kwargs):
+        self.func = func
+        if 'max_chars' in kwargs:
+            self.max_chars = kwargs['max_chars']
+        self._value = _NOT_EVALUATED
+        self._text = None
+
+    @property
+    def evaluated(self):
+        "Whether the value has been worked out yet."
+        return self._value is not _NOT_EVALUATED
+
+    @property
+    def value(self):
+        "The value, calling func the first time it is needed."
+        if self._value is _NOT_EVALUATED:
+            self._value = self.func()
+        return self._value
+
+    def __str__(self):
+        if self._text is None:
+            self._text = _limited_text(self.value, self.max_chars)
+        return self._text
+    if not PY3:
+        __unicode__ = __str__
+        def __str__(self):
+            return self.__unicode__().encode('utf-8')
+
+    def __format__(self, spec):
+        return format(self.value, spec)
+
+    def __repr__(self):
+        return 'Deferred(%r)' % (self.func,)
+
+def _resolved(value):
+    "The value itself for a Deferred value, otherwise the value unchanged."
+    return value.value if type(value) is Deferred else value
+
+def _is_format_spec(spec):
+    "Whether spec is valid for format() with some kind of value."
+    for value in (0, 0.0, ''):
+        try:
+            format(value, spec)
+            return True
+        except ValueError:
+            pass
+    return False
+
+def _formatter(spec):
+    """Make a function formatting values for display from a format spec.
+
+    See Table.set_format() for the kinds of spec. Values the spec can't
+    format, like the blanks padding short rows, are shown unchanged."""
+    printf = None # An equivalent printf-style template, if there is one
+    if callable(spec):
+        func = spec
+    elif '{' in spec:
+        func = spec.format
+        match = re.match(r'\{0?:([^{}]*)\}$', spec)
+        if match:
+            printf = _printf_template(match.group(1))
+    elif '%' in spec and not _is_format_spec(spec):
+        def func(value):
+            try:
+                return spec % (value,)
+            except (ValueError, TypeError):
+                # e.g. strftime codes like '%Y-%m-%d' for dates
+                return format(value, spec)
+        if set(_printf_conversions.findall(spec)) <= set('diouxXeEfFgG%'):
+            printf = spec
+    else:
+        func = lambda value: format(value, spec)
+        printf = _printf_template(spec)
+    def fmt(value):
+        if type(value) is Deferred:
+            value = value.value
+        try:
+            return func(value)
+        except (ValueError, TypeError):
+            return value
+    fmt.printf = printf
+    return fmt
+
+_printf_conversions = re.compile(r'%[-+ #0]*\d*(?:\.\d+)?(.)')
+_simple_format_spec = re.compile(r'([-+ ]?)(0?)(\d*)(\.\d+)?([eEfFgG])$')
+
+def _printf_template(spec):
+    """The printf-style template formatting numbers like format() with spec,
+    or None if there isn't one."""
+    match = _simple_format_spec.match(spec)
+    if match is None:
+        return None
+    sign, zero, width, precision, kind = match.groups()
+    if sign == '-':
+        # The default for format(), but left-justifies in printf
+        sign = ''
+    return '%' + ''.join(part or '' for part in
+                         (sign, zero, width, precision, kind))
+
+def _format_values(values, fmt):
+    """Format a sequence of values for display with fmt from _formatter().
+
+    A NumPy array of numbers is formatted in one go where fmt has a printf
+    template for numbers."""
+    kind = getattr(getattr(values, 'dtype', None), 'kind', None)
+    printf = fmt.printf
+    if (kind is not None and kind in 'iuf' and printf is not None
+            and '\n' not in printf):
+        # A single % operation for the whole block is faster than
+        # numpy.char.mod, which formats each value separately.
+        try:
+            text = (printf + '\n') * len(values) % tuple(values.tolist())
+            return text.split('\n')[:-1]
+        except (ValueError, TypeError):
+            pass
+    return [fmt(value) for value in values]
+
+class _LatexEscaper(object):
+    """Escape LaTeX special characters in many values at once.
+
+    The result is the same as substituting TableCell._latex_escape_re, but
+    numbers and strings without special characters are passed straight
+    through, the rest are escaped with a single str.translate, and escaped
+    short strings are kept in a bounded LRU memo, as they tend to be repeated
+    labels.
+    """
+    _text = str if PY3 else unicode
+    _number_types = frozenset([int, float, bool] + ([] if PY3 else [long]))
+    _special_re = re.compile('[%s]' % re.escape(''.join(
+                        k for k in TableCell._latex_escape_table if len(k) == 1)))
+    # '\r\n' is the only multi-character sequence; it is turned into '\n'
+    # before translating, which maps both '\r' and '\n' to a line break.
+    _translation = dict((ord(k), v) for k, v in
+                        TableCell._latex_escape_table.items() if len(k) == 1)
+    memo_max_length = 100 # Longer strings are not memoised
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._memo = Dict()
+
+    def escape(self, value):
+        "Convert a value to text with LaTeX special characters escaped."
+        if type(value) in self._number_types:
+            return self._text(value)
+        return self.many((value,))[0]
+
+    def many(self, values):
+        "Escape a row or column of values, returning a list of strings."
+        memo = self._memo
+        text_type = self._text
+        number_types = self._number_types
+        special = self._special_re.search
+        out = []
+        append = out.append
+        for value in values:
+            if type(value) in number_types:
+                append(text_type(value))
+                continue
+            text = value if type(value) is text_type else text_type(value)
+            escaped = memo.pop(text, None)
+            if escaped is None:
+                if special(text) is None:
+                    escaped = text
+                else:
+                    escaped = text.replace('\r\n', '\n').translate(
+                                                            self._translation)
+                if len(text) > self.memo_max_length:
+                    append(escaped)
+                    continue
+                if len(memo) >= self.maxsize:
+                    try:
+                        memo.popitem(last=False)
+                    except KeyError:
+                        pass
+            memo[text] = escaped # (re)insert as the most recently used
+            append(escaped)
+        return out
+
+_latex_escaper = _LatexEscaper()
+_latex_escape = _latex_escaper.escape
+
+class _Covered(str):
+    "The type of _COVERED."
+    __slots__ = ()
+
+# Held by a row in the positions covered by a column span, in place of a
+# cell. It is a blank string, so it renders as a blank if the span shrinks.
+_COVERED = _Covered('')
+
+class SpanPlaceholder(TableCell):
+    """A position covered by the column span of a cell to its left, as
+    returned by Table.cell() and TableRow.cells.
+
+    The row only holds a shared marker for such positions; a placeholder is
+    made each time one is looked up. covered_by is the spanning cell, or None
+    if the span no longer reaches this far. Changing the placeholder puts it
+    in the row as an ordinary cell, shown if the span is made smaller.
+    """
+    __slots__ = ('covered_by', '_index')
+
+    def __init__(self, row, index, covered_by):
+        TableCell.__init__(self, '', header=row._header)
+        self._row = row
+        self._index = index
+        self.covered_by = covered_by
+
+    def __repr__(self):
+        return 'SpanPlaceholder(%r, covered_by=%r)' % (self._value,
+                                                        self.covered_by)
+
+    def _materialise(self):
+        row = self._row
+        if row is not None and row._slots[self._index] is _COVERED:
+            row._set_slot(self._index, self)
+
+    def _changed(self):
+        self._materialise()
+        TableCell._changed(self)
+
+    def _spans_changed(self):
+        self._materialise()
+        TableCell._spans_changed(self)
+
 class TableHeader(TableCell):
+    __slots__ = ()
+
     def __init__(self, value, **kwargs):
        # header of a TableHeader is always True
        if 'header' in kwargs:
            del kwargs['header']
        super(TableHeader, self).__init__(value, header=True, **kwargs)
 
+class _CellList(MutableSequence):
+    """The cells of a row, as seen through TableRow.cells.
+
+    Rows store plain values until a cell object is asked for, so looking up
+    an item here turns the value into a TableCell in place."""
+    def __init__(self, row):
+        self._row = row
+
+    def __len__(self):
+        return len(self._row._slots)
+
+    def __getitem__(self, index):
+        row = self._row
+        if isinstance(index, slice):
+            return [row._cell_at(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return row._cell_at(index)
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += len(self)
+        self._row._set_slot(index, value)
+
+    def __delitem__(self, index):
+        raise TypeError("cells cannot be removed from a row")
+
+    def insert(self, index, value):
+        if index != len(self):
+            raise TypeError("cells can only be added at the end of a row")
+        self._row.append_cell(value)
+
+    def __repr__(self):
+        return repr(list(self))
+
 class TableRow(object):
+    _header = False # Whether plain values in the row are header cells
+    _header_columns = frozenset() # Columns of plain values shown as headers
+    # Last rendered output, as (layout entries, text, rule styles), or None
+    # if it changed
+    _html_cache = None
+    _html_compact_cache = None
+    _latex_cache = None
+    _text_cache = None
+    # Formatted values by column, from _formatted_values(), or None
+    _formatted = None
+
     def  __init__(self, *cells, **kwargs):
         self.parent = None
         self.max_len = kwargs.get('max_len',None)
-        self.cells = []
+        self._slots = []
+        self._ncols = 0 # Running column count, None if it needs recounting
         for c in cells:
             self.append_cell(c)
         if self.max_len is not None:
@@ -152,41 +641,136 @@ class TableRow(object):
             if cur_len < self.max_len:
                 for c in range(self.max_len - cur_len):
                     self.append_cell('')
-            
+
+    @classmethod
+    def from_values(cls, values, max_len=None):
+        """Make a row from any iterable of values and cells.
+
+        This is a fast path for bulk loading: plain values are stored as they
+        are and the column count is worked out in a single pass. The row is
+        padded with blank cells up to max_len, like the constructor."""
+        slots = list(values)
+        for c in slots:
+            if isinstance(c, TableCell):
+                return cls(*slots, max_len=max_len)
+        row = cls.__new__(cls)
+        row.parent = None
+        row.max_len = max_len
+        if max_len is not None and len(slots) < max_len:
+            slots.extend([''] * (max_len - len(slots)))
+        row._slots = slots
+        row._ncols = len(slots)
+        return row
+
     @property
-    def _current(self):
-        """This provides column and rowspan information for the following row
-
-        If the row above spans into the current row it decrements the row 
-        span value from the row above.  This also updates the current row's 
-        cell's row_span information to reflect any correction based on the 
-        previous row."""
-        decp_a = []
-        if len(self._above)>0:
-            for r, c in self._above:
-                decp_a += [(r,c)]
-        else:
-            decp_a = [(1,1) for c in range(self.column_count())]
-        count = 0
-        current = []
-        for index, c in enumerate(self.cells):
-            if index == count:
-                for col in range(c.col_span):
-                    row_above, col_above = decp_a[count]
-                    rs = c.row_span if row_above==1 else row_above-1
-                    cs = c.col_span if row_above==1 else col_above
-                    current.append([rs, cs])
-                    count +=1
-        return current
+    def cells(self):
+        """The cells of the row, as TableCell objects.
+
+        Plain values are only wrapped in a TableCell when they are looked up
+        here, so rendering a table never creates cell objects."""
+        return _CellList(self)
+    @cells.setter
+    def cells(self, cells):
+        self._slots = [self._adopt(c) for c in cells]
+        self._spans_changed()
+
+    def _cell_at(self, index):
+        """Return the cell at index, turning a plain value into a TableCell,
+        or a SpanPlaceholder for a position covered by a column span."""
+        c = self._slots[index]
+        if c is _COVERED:
+            return SpanPlaceholder(self, index, self._covering(index))
+        if not isinstance(c, TableCell):
+            c = TableCell(c, header=self._header)
+            c._row = self
+            self._slots[index] = c
+        return c
+
+    def _covering(self, index):
+        "The cell whose column span covers index, or None."
+        slots = self._slots
+        for i in range(index - 1, -1, -1):
+            c = slots[i]
+            if isinstance(c, TableCell) and i + c._col_span > index:
+                return c
+        return None
+
+    def _adopt(self, c):
+        "Link a cell to this row, so that span changes reach the table."
+        if isinstance(c, TableCell):
+            c._row = self
+        return c
+
+    def _set_slot(self, index, c):
+        self._slots[index] = self._adopt(c)
+        self._spans_changed()
 
+    def _slot(self, index):
+        "The cell or plain value at index, or None past the end of the row."
+        slots = self._slots
+        return slots[index] if index < len(slots) else None
+
+    def _value_at(self, index):
+        "The value at index, or None past the end of the row."
+        c = self._slot(index)
+        return c._value if isinstance(c, TableCell) else c
+
+    def _spanning(self):
+        "Whether any cell in the row spans more than one row or column."
+        for c in self._slots:
+            if isinstance(c, TableCell) and (c._row_span > 1 or
+                                             c._col_span > 1):
+                return True
+        return False
+            
     def set_parent(self, parent):
         self.parent = parent
+
+    def _cells_changed(self):
+        """Drop the cached rendering of the row, and the table's column
+        indexes and style rule results, after one of its cells changed."""
+        self._html_cache = self._html_compact_cache = self._latex_cache = None
+        self._text_cache = self._formatted = None
+        parent = self.parent
+        if parent is not None:
+            if parent._indexes:
+                parent._indexes = {}
+            parent._rule_cache = parent._budget_used = None
+
+    def _spans_changed(self):
+        "Drop cached column counts, rendering and layout after a span change."
+        self._ncols = None
+        self._cells_changed()
+        if self.parent is not None:
+            self.parent._layout = None
+
+    def _render_cached(self, fmt, entries, table, prof=None, styles=None):
+        """Render the row as 'html', 'html_compact', 'latex' or 'text',
+        reusing the last output if neither the row nor its layout entries
+        and rule styles have changed since."""
+        attr = '_%s_cache' % fmt
+        cache = getattr(self, attr)
+        if cache is not None and cache[0] == entries and cache[2] == styles:
+            table._cache_hits += 1
+            return cache[1]
+        table._cache_misses += 1
+        text = self._render(fmt, entries, prof, styles)
+        setattr(self, attr, (entries, text, styles))
+        return text
+
+    def _append_slot(self, c):
+        "Append a cell or value, keeping the running column count."
+        self._cells_changed()
+        if self.parent is not None:
+            self.parent._layout = None
+        slots = self._slots
+        if self._ncols == len(slots):
+            self._ncols += c._col_span if isinstance(c, TableCell) else 1
+        slots.append(self._adopt(c))
             
     def append_cell(self, c):
-        if not isinstance(c, TableCell):
-            c = TableCell(c)
-        if c.col_span>1:
-            self.cells.append(c)
+        self._append_slot(c)
+        if isinstance(c, TableCell) and c.col_span>1:
             index = self.column_count()
             blanks = c.col_span -1
             if self.max_len is not None:
@@ -195,108 +779,1764 @@ class TableRow(object):
                 count = m_l - index if new_len > self.max_len else blanks
             else:
                 count = blanks
-            for blank in range(count):
-                self.cells.append(TableCell(''))
-        else:
-            self.cells.append(c)
+            if count > 0:
+                end = len(self._slots) + count
+                self._slots.extend([_COVERED] * count)
+                if self._ncols is not None and end > self._ncols:
+                    self._ncols = end
 
     def column_count(self, debug=False):
+        """The number of columns the row covers, taking column spans into
+        account.
+
+        This is kept up to date as cells are appended, and only recounted
+        after a span changes or with debug=True, which prints each cell."""
+        if self._ncols is not None and not debug:
+            return self._ncols
         count = 0
-        for index, c in enumerate(self.cells):
+        for index, c in enumerate(self._slots):
+            if isinstance(c, TableCell):
+                value, col_span = c.value, c.col_span
+            else:
+                value, col_span = c, 1
             if debug:
                 print('index = {}, value = "{}", col_span = {}'.format(index,
-                                                                     c.value,
-                                                                     c.col_span))
+                                                                     value,
+                                                                     col_span))
             if index == count:
-                count += c.col_span
+                count += col_span
+        self._ncols = count
         return count
     
-    def _repr_html_(self):
-        # Note: Because of how a row is rendered, if a cell to the right of a
-        # cell, with col_span greater than 1, contains content, that content 
-        # will not be rendeded.  The content is not distroyed, just not rended.
-        cur = self._current # Updates the current cells row span info
-        abv = [[1,1] for c in cur] if len(self._above)==0 else self._above
-        html = '<tr>'
-        index = 0      
-        for count, values in enumerate(zip(abv,cur)):
-            (a_row, a_col), (c_row, c_col) = values
-            if index == count:
-                if a_row==1:
-                    html += self.cells[index]._repr_html_()
-                    index += c_col
+    def _value_formats(self):
+        """Formatters for plain values by column, from the parent table, or
+        None if there are none."""
+        if self._header or self.parent is None:
+            return None
+        return self.parent._formats or None
+
+    def _formatted_values(self, formats):
+        """Return the values in the row formatted for display, as a dict by
+        column, reusing the text from earlier renders until a cell in the
+        row changes."""
+        texts = self._formatted
+        if texts is None:
+            slots = self._slots
+            texts = {}
+            for col, fmt in formats.items():
+                if col < len(slots):
+                    c = slots[col]
+                    texts[col] = fmt(c._value if isinstance(c, TableCell)
+                                     else c)
+            self._formatted = texts
+        return texts
+
+    def _html(self, entries, prof=None, compact=False, styles=None):
+        """Render the row as HTML, given its entries from a _Layout, with
+        the RenderProfile collecting timings, if any, and styles from
+        Table._rule_styles() in place of the cells' own, if given.
+
+        Note: if a cell to the right of a cell with col_span greater than 1
+        contains content, that content will not be rendered.  The content is
+        not destroyed, just not rendered."""
+        header = self._header
+        header_cols = self._header_columns
+        formats = self._value_formats()
+        th, td = ('<th>%s</th>', '<td>%s</td>') if compact else \
+                 ('<th  >%s</th>', '<td  >%s</td>')
+        parts = ['<tr>']
+        if entries is None:
+            slots = self._slots
+            if formats is None and not header_cols and styles is None:
+                plain = th if header else td
+                for c in slots:
+                    if isinstance(c, TableCell):
+                        parts.append(c._html(c._row_span, c._col_span,
+                                             c._value, compact))
+                    else:
+                        parts.append(plain % (c,))
+                parts.append('</tr>')
+                return ''.join(parts)
+            entries = [(col, 1, 1, c) for col, c in enumerate(slots)]
+        texts = None
+        if formats is not None:
+            texts = (self._formatted_values(formats) if prof is None else
+                     prof._timed('format', self._formatted_values, formats))
+        for col, rs, cs, c in entries:
+            if not rs:
+                continue
+            is_cell = isinstance(c, TableCell)
+            value = c._value if is_cell else c
+            if texts is not None and col in texts:
+                value = (texts[col] if not is_cell or c._row is self else
+                         _origin_text(c, col))
+            if styles is not None and col in styles:
+                parts.append(_cell_html(styles[col], rs, cs, value, compact))
+            elif is_cell:
+                parts.append(c._html(rs, cs, value, compact))
+            elif header or col in header_cols:
+                parts.append(th % (value,))
+            else:
+                parts.append(td % (value,))
+        parts.append('</tr>')
+        return ''.join(parts)
+
+    def _html_compact(self, entries, prof=None, styles=None):
+        "Render the row as compact HTML, given its entries from a _Layout."
+        return self._html(entries, prof, compact=True, styles=styles)
+
+    def _render(self, fmt, entries, prof=None, styles=None):
+        """Render the row in the given format, with styles from style rules
+        for the HTML formats."""
+        if styles is None:
+            return getattr(self, '_' + fmt)(entries, prof)
+        return getattr(self, '_' + fmt)(entries, prof, styles=styles)
+
+    def _styled_cells(self):
+        "The cells in the row which have colours set."
+        for c in self._slots:
+            if isinstance(c, TableCell) and (c._style[1] or c._style[2]):
+                yield c
+
+    def _latex(self, entries, prof=None):
+        """Render the row as LaTeX, given its entries from a _Layout, with
+        the RenderProfile collecting timings, if any."""
+        prefix = u"\\bf "
+        header = self._header
+        header_cols = self._header_columns
+        formats = self._value_formats()
+        if entries is None:
+            slots = self._slots
+            if (formats is None and not header_cols and
+                    not any(isinstance(c, TableCell) for c in slots)):
+                # Only plain values, which can be escaped in one go
+                parts = (_latex_escaper.many(slots) if prof is None else
+                         prof._timed('escape', _latex_escaper.many, slots))
+                if header:
+                    parts = [prefix + p for p in parts]
+                return ' & '.join(parts) + '\\\\'
+            entries = [(col, 1, 1, c) for col, c in enumerate(slots)]
+        texts = None
+        if formats is not None:
+            texts = (self._formatted_values(formats) if prof is None else
+                     prof._timed('format', self._formatted_values, formats))
+        values = []
+        for col, rs, cs, c in entries:
+            if rs:
+                is_cell = isinstance(c, TableCell)
+                value = c._value if is_cell else c
+                if texts is not None and col in texts:
+                    value = (texts[col] if not is_cell or c._row is self else
+                             _origin_text(c, col))
+                values.append(value)
+        texts = iter(_latex_escaper.many(values) if prof is None else
+                     prof._timed('escape', _latex_escaper.many, values))
+        parts = []
+        for col, rs, cs, cell in entries:
+            if rs:
+                text = next(texts)
+                if isinstance(cell, TableCell):
+                    parts.append(cell._latex(rs, cs, text))
+                elif header or col in header_cols:
+                    parts.append(prefix + text)
                 else:
-                    index += a_col
-        html +='</tr>'
-        return html
+                    parts.append(text)
+                continue
+            # An empty cell as wide as the row span covering it from above
+            parts.append("\\multicolumn{%d}{l}{}" % cs if cs > 1 else '')
+        return ' & '.join(parts) + '\\\\'#\n'
+
+    def _text(self, entries, prof=None):
+        """Render the row for the text formats, given its entries from a
+        _Layout, as a tuple of (col_span, text) pairs for the cells in column
+        order. Positions covered by a row span from above have blank text."""
+        formats = self._value_formats()
+        if entries is None:
+            slots = self._slots
+            if formats is None:
+                return tuple([(1, '%s' % (c._value if isinstance(c, TableCell)
+                                          else c,)) for c in slots])
+            entries = [(col, 1, 1, c) for col, c in enumerate(slots)]
+        texts = None
+        if formats is not None:
+            texts = (self._formatted_values(formats) if prof is None else
+                     prof._timed('format', self._formatted_values, formats))
+        cells = []
+        for col, rs, cs, c in entries:
+            if not rs:
+                cells.append((cs, ''))
+                continue
+            is_cell = isinstance(c, TableCell)
+            value = c._value if is_cell else c
+            if texts is not None and col in texts:
+                value = (texts[col] if not is_cell or c._row is self else
+                         _origin_text(c, col))
+            cells.append((cs, '%s' % (value,)))
+        return tuple(cells)
+
+    def _repr_html_(self):
+        return self._html(_Layout([self]).entries[0])
 
     def _repr_latex_(self):
-        # Note: Because of how a row is rendered, if a cell to the right of a
-        # cell, with col_span greater than 1, contains content, that content 
-        # will not be rendeded.  The content is not distroyed, just not rended.
-        cur = self._current # Updates the current cells row span info
-        abv = [[1,1] for c in cur] if len(self._above)==0 else self._above
-        latex = ''
-        index = 0
-        for count, values in enumerate(zip(abv,cur)):
-            (a_row, a_col), (c_row, c_col) = values
-            if index == count:
-                if index != 0:
-                    latex += ' & '
-                _cell = self.cells[index]
-                if a_row==1:
-                    latex += _cell._repr_latex_()
-                    index += c_col
-                else:
-                    # For cells not being rendered, their status need to be  
-                    # temporarily changed to suppress output and reflec the 
-                    # previous row's column span.
-                    _cell._suppress = True
-                    tmp, _cell._col_span = _cell._col_span, a_col
-                    latex += _cell._repr_latex_()
-                    _cell._col_span = tmp
-                    _cell._suppress = False
-                    index += a_col
-        latex += '\\\\'#\n'
-        return latex
+        return self._latex(_Layout([self]).entries[0])
+
+def _origin_text(cell, col):
+    """The displayed value of a cell spanning down into the first row of a
+    view from a row above, formatted as it is in its own row."""
+    row = cell._row
+    formats = row._value_formats() if row is not None else None
+    if not formats or col not in formats:
+        return cell._value
+    return row._formatted_values(formats)[col]
 
 class TableHeaderRow(TableRow):
+    _header = True
+
     def append_cell(self, c):
-        if not isinstance(c, TableCell):
-            c = TableCell(c, header=True)
-        self.cells.append(c)
+        self._append_slot(c)
 
     def set_parent(self, parent):
         super(TableHeaderRow, self).set_parent(parent)
         self.parent.has_header = True
 
+    def _latex(self, entries, prof=None):
+        return (super(TableHeaderRow, self)._latex(entries, prof) +
+                '\\\nhline')
+
+def _column_buffer(values):
+    """Return values in a form a _ColumnStore can index by position.
+
+    Sequences and arrays are used as they are, and pandas Series by the array
+    behind them; anything else, such as a dict or a generator, is iterated
+    over into a list."""
+    if isinstance(values, (array, _StringColumn, _BlankedColumn)):
+        return values
+    if hasattr(values, 'dtype'):
+        if hasattr(values, 'index') and hasattr(values, 'values'):
+            return values.values # A Series, indexed by label
+        return values
+    if isinstance(values, Sequence):
+        return values
+    return list(values)
+
+class _ColumnStore(object):
+    """Column-oriented storage for a block of table rows.
+
+    Each column is any indexable sequence - a list, an array.array or a NumPy
+    array - and is read from directly when rendering. Shorter columns are
+    padded with blanks. Anything set on individual cells is kept sparsely in
+    ``cells``, a dict mapping row index to {column index: cell or value}.
+    """
+    def __init__(self, columns, header_columns=()):
+        self.header_columns = frozenset(header_columns)
+        self.columns = [_column_buffer(c) for c in columns]
+        self.lengths = [len(c) for c in self.columns]
+        self.nrows = max(self.lengths) if self.lengths else 0
+        self.cells = {}
+        # Formatted values, as {(column, block): (formatter, texts)}
+        self.formatted = {}
+
+    def row(self, index):
+        "Return the values and cells in a row as a list."
+        if min(self.lengths) > index:
+            values = [col[index] for col in self.columns]
+        else:
+            values = [col[index] if index < n else ''
+                      for col, n in zip(self.columns, self.lengths)]
+        override = self.cells.get(index)
+        if override:
+            for c, value in override.items():
+                values[c] = value
+        return values
+
+    def column_values(self, col, start, stop):
+        """Return the values in a column for rows start:stop as a list,
+        read from the column buffer in one go. Cells set on the rows take the
+        place of the values, and Deferred values are worked out."""
+        column, n = self.columns[col], self.lengths[col]
+        end = min(stop, n)
+        try:
+            part = column[start:end] if start < end else []
+        except TypeError: # Doesn't support slicing
+            part = [column[i] for i in range(start, end)]
+        values = part.tolist() if hasattr(part, 'tolist') else list(part)
+        if end < stop:
+            values.extend([''] * (stop - max(start, end)))
+        if not hasattr(column, 'dtype') and Deferred in set(map(type, values)):
+            values = [_resolved(v) for v in values]
+        for index, override in self.cells.items():
+            if start <= index < stop and col in override:
+                c = override[col]
+                values[index - start] = _resolved(
+                    c._value if isinstance(c, TableCell) else c)
+        return values
+
+    _FORMAT_BLOCK = 1024 # Rows formatted at a time, see format_value()
+
+    def format_value(self, col, index, fmt):
+        """Return the value in a column formatted for display by fmt.
+
+        The column is formatted a block of rows at a time, and the results
+        are kept until the formatter changes."""
+        block = index // self._FORMAT_BLOCK
+        start = block * self._FORMAT_BLOCK
+        cached = self.formatted.get((col, block))
+        if cached is None or cached[0] is not fmt:
+            column = self.columns[col]
+            stop = min(start + self._FORMAT_BLOCK, self.lengths[col])
+            try:
+                values = column[start:stop]
+            except TypeError: # Doesn't support slicing
+                values = [column[i] for i in range(start, stop)]
+            cached = self.formatted[(col, block)] = (
+                fmt, _format_values(values, fmt))
+        return cached[1][index - start]
+
+class _ColumnRow(TableRow):
+    """A row of a table whose values are held in a _ColumnStore.
+
+    Only the store and the row index are kept here; cells are looked up in
+    the column buffers when the row is rendered, and created on demand."""
+    def __init__(self, store, index):
+        self.parent = None
+        self.max_len = None
+        self._ncols = len(store.columns)
+        self._store = store
+        self._index = index
+
+    @property
+    def _slots(self):
+        return self._store.row(self._index)
+
+    @property
+    def _header_columns(self):
+        return self._store.header_columns
+
+    def _cell_at(self, index):
+        store, row = self._store, self._index
+        if index >= len(store.columns):
+            raise IndexError(index)
+        override = store.cells.get(row)
+        if override and index in override:
+            c = override[index]
+        else:
+            c = store.columns[index][row] if row < store.lengths[index] else ''
+        if c is _COVERED:
+            return SpanPlaceholder(self, index, self._covering(index))
+        if not isinstance(c, TableCell):
+            c = TableCell(c, header=self._header or
+                                    index in store.header_columns)
+            c._row = self
+            store.cells.setdefault(row, {})[index] = c
+        return c
+
+    def _slot(self, index):
+        store, row = self._store, self._index
+        if index >= len(store.columns):
+            return None
+        override = store.cells.get(row)
+        if override and index in override:
+            return override[index]
+        return store.columns[index][row] if row < store.lengths[index] else ''
+
+    def _formatted_values(self, formats):
+        # The formatted values are kept by the store, a block at a time
+        store, index = self._store, self._index
+        override = store.cells.get(index, ())
+        block, offset = divmod(index, store._FORMAT_BLOCK)
+        texts = {}
+        for col, fmt in formats.items():
+            if col >= len(store.columns):
+                continue
+            if col in override or index >= store.lengths[col]:
+                c = self._slots[col]
+                texts[col] = fmt(c._value if isinstance(c, TableCell) else c)
+                continue
+            cached = store.formatted.get((col, block))
+            if cached is not None and cached[0] is fmt:
+                texts[col] = cached[1][offset]
+            else:
+                texts[col] = store.format_value(col, index, fmt)
+        return texts
+
+    def _set_slot(self, index, c):
+        if index >= len(self._store.columns):
+            raise IndexError(index)
+        self._store.cells.setdefault(self._index, {})[index] = self._adopt(c)
+        self._spans_changed()
+
+    def append_cell(self, c):
+        raise TypeError("rows of a table built from columns have a fixed "
+                        "width")
+
+    def _set_cells(self, cells):
+        cells = list(cells)
+        if len(cells) != len(self._store.columns):
+            raise TypeError("rows of a table built from columns have a fixed "
+                            "width of %d cells, not %d"
+                            % (len(self._store.columns), len(cells)))
+        self._store.cells[self._index] = dict(
+            (index, self._adopt(c)) for index, c in enumerate(cells))
+        self._spans_changed()
+
+    cells = property(TableRow.cells.fget, _set_cells)
+
+    def _styled_cells(self):
+        for c in self._store.cells.get(self._index, {}).values():
+            if isinstance(c, TableCell) and (c._style[1] or c._style[2]):
+                yield c
+
+    def _spanning(self):
+        for c in self._store.cells.get(self._index, {}).values():
+            if isinstance(c, TableCell) and (c._row_span > 1 or
+                                             c._col_span > 1):
+                return True
+        return False
+
+class _Layout(object):
+    """Row and column span layout for a sequence of rows.
+
+    The rows are walked once, tracking the row spans still open from the rows
+    above. For every row, ``entries`` holds None if no spans touch it (all of
+    its cells are rendered as they are), or a list of ``(col, row_span,
+    col_span, cell)`` tuples in column order. A row_span of 0 marks a
+    placeholder for ``col_span`` columns covered by a cell from a row above;
+    columns covered by a cell to their left in the same row are left out.
+    ``incoming`` maps row indices to the span origins reaching into that row
+    from above, as ``(row, col, row_span, col_span, cell)`` tuples. ``rows``
+    keeps the rows it was worked out for, so that a table can tell when rows
+    have been inserted or reordered, and rows appended to the table are laid
+    out by adding them to the end.
+    """
+    def __init__(self, rows):
+        self.nrows = 0
+        self.rows = []
+        self.entries = []
+        self.incoming = {}
+        self._active = [] # Row spans still open below the last row
+        self._add(rows)
+
+    def _add(self, rows):
+        rows = list(rows)
+        self.rows.extend(rows)
+        self.store_runs = None # From Table._store_runs()
+        entries = self.entries
+        incoming = self.incoming
+        active = self._active
+        for r, row in enumerate(rows, self.nrows):
+            if active:
+                active = [a for a in active if a[0] + a[2] > r]
+            if not active and not row._spanning():
+                entries.append(None)
+                continue
+            cells = row._slots
+            covered = {}
+            if active:
+                incoming[r] = tuple(active)
+                for o_row, o_col, rs, cs, cell in active:
+                    covered[o_col] = cs
+                    for c in range(o_col + 1, o_col + cs):
+                        covered[c] = 0
+            row_entries = []
+            width = len(cells)
+            c = 0
+            while c < width:
+                cs = covered.get(c)
+                if cs is not None:
+                    if cs:
+                        row_entries.append((c, 0, cs, None))
+                        c += cs
+                    else:
+                        c += 1
+                    continue
+                cell = cells[c]
+                if isinstance(cell, TableCell):
+                    rs, cs = cell._row_span, cell._col_span
+                else:
+                    rs = cs = 1
+                row_entries.append((c, rs, cs, cell))
+                if rs > 1:
+                    active.append((r, c, rs, cs, cell))
+                c += cs
+            entries.append(row_entries)
+        self._active = active
+        self.nrows = len(entries)
+
+# Held while Table._get_layout() adds rows to a layout
+_layout_lock = threading.Lock()
+
+def _row_values(row, entries, layout, r):
+    """The values shown in row r, as a list. Positions covered by a span take
+    the value of the spanning cell. Deferred values are worked out."""
+    values = [_resolved(c._value if isinstance(c, TableCell) else c)
+              for c in row._slots]
+    if entries is not None:
+        for col, rs, cs, cell in entries:
+            if rs == 0:
+                for o_row, o_col, o_rs, o_cs, o_cell in layout.incoming[r]:
+                    if o_col == col:
+                        cell = o_cell
+                        break
+            if isinstance(cell, TableCell):
+                for c in range(col, min(col + cs, len(values))):
+                    values[c] = _resolved(cell._value)
+    return values
+
+def _span_blocks(layout, start, stop):
+    """Split rows start:stop of a table into (start, stop) blocks, so that
+    no row span continues from one block into the next."""
+    incoming = layout.incoming
+    blocks = []
+    for r in range(start + 1, stop):
+        if r not in incoming:
+            blocks.append((start, r))
+            start = r
+    if start < stop:
+        blocks.append((start, stop))
+    return blocks
+
+# Binary format of Table.to_bytes(): the magic bytes, the length of the
+# header, then the header - JSON describing the blocks of rows - and the data
+# it refers to, each padded to a multiple of 8 bytes.
+_MAGIC = b'TABIPY\x00\x01'
+
+def _pad8(n):
+    return -n % 8
+
+class _StringColumn(object):
+    "A column of strings read from UTF-8 text and a buffer of offsets."
+    def __init__(self, offsets, text):
+        self._offsets = offsets
+        self._text = text
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        offsets = self._offsets
+        return bytes(self._text[offsets[index]:offsets[index + 1]]).decode(
+            'utf-8', 'surrogatepass')
+
+class _BlankedColumn(object):
+    "A column of numbers with blanks in some rows."
+    def __init__(self, values, blanks):
+        self._values = values
+        self._blanks = frozenset(blanks)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self._values)
+        return '' if index in self._blanks else self._values[index]
+
+def _pack_column(values, chunks, offset):
+    """Add the data for a column of values to chunks, a list of byte strings
+    starting at offset in the data. Return a description of it, and the
+    offset after it."""
+    dtype = getattr(values, 'dtype', None)
+    if dtype is not None and dtype.kind in 'biuf':
+        import numpy
+        data = numpy.ascontiguousarray(values).tobytes()
+        desc = {'type': 'array', 'dtype': dtype.str}
+    else:
+        values = [_resolved(v) for v in values]
+        blanks = [i for i, v in enumerate(values) if type(v) is str and v == '']
+        types = set(type(v) for v in values if not (type(v) is str and v == ''))
+        desc = {}
+        if types == set([int]) and all(-2**63 <= v < 2**63 for v in values
+                                       if type(v) is int):
+            data = array('q', [0 if type(v) is str else v
+                               for v in values]).tobytes()
+            desc = {'type': 'int', 'blanks': blanks}
+        elif types == set([float]):
+            data = array('d', [0.0 if type(v) is str else v
+                               for v in values]).tobytes()
+            desc = {'type': 'float', 'blanks': blanks}
+        elif types <= set([str]):
+            text = [v.encode('utf-8', 'surrogatepass') for v in values]
+            ends = [0]
+            end = 0
+            for t in text:
+                end += len(t)
+                ends.append(end)
+            # 4 byte offsets unless the text is too long for them
+            code = 'I' if end < 2**32 and array('I').itemsize == 4 else 'q'
+            data = array(code, ends).tobytes() + b''.join(text)
+            desc = {'type': 'str', 'offsets': code}
+        else:
+            data = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+            desc = {'type': 'pickle'}
+    desc.update(offset=offset, size=len(data), n=len(values))
+    chunks.append(data)
+    chunks.append(b'\0' * _pad8(len(data)))
+    return desc, offset + len(data) + _pad8(len(data))
+
+def _unpack_column(desc, data, byteorder):
+    "Make a column from its description and a memoryview of the data."
+    kind, n = desc['type'], desc['n']
+    raw = data[desc['offset']:desc['offset'] + desc['size']]
+    def numbers(code, raw):
+        if byteorder == sys.byteorder:
+            return raw.cast(code)
+        values = array(code, bytes(raw))
+        values.byteswap()
+        return values
+    if kind == 'array':
+        import numpy
+        return numpy.frombuffer(raw, numpy.dtype(desc['dtype']), n)
+    if kind in ('int', 'float'):
+        values = numbers('q' if kind == 'int' else 'd', raw)
+        if desc['blanks']:
+            values = _BlankedColumn(values, desc['blanks'])
+        return values
+    if kind == 'str':
+        code = desc['offsets']
+        split = array(code).itemsize * (n + 1)
+        return _StringColumn(numbers(code, raw[:split]), raw[split:])
+    return pickle.loads(bytes(raw))
+
+def _row_blocks(rows):
+    """Split rows into runs that are stored as one block of columns: rows of
+    the same kind and, for rows from a _ColumnStore, consecutive rows of the
+    same store. Yields ((header, header_columns, store), rows) pairs."""
+    block, key = [], None
+    for row in rows:
+        store = getattr(row, '_store', None)
+        row_key = (row._header, row._header_columns, store)
+        if block and (row_key != key or (store is not None and
+                                         row._index != block[-1]._index + 1)):
+            yield key, block
+            block = []
+        key = row_key
+        block.append(row)
+    if block:
+        yield key, block
+
+def _pack_block(key, rows, styles, chunks, offset):
+    """Add the data for a block of rows from _row_blocks() to chunks, and
+    return a description of it and the offset after it. styles maps the
+    _CellStyle records used to their numbers."""
+    header, header_columns, store = key
+    cells, covered = [], []
+    def add_cells(i, items):
+        for j, c in items:
+            if c is _COVERED:
+                covered.append([i, j])
+            elif isinstance(c, TableCell):
+                plain = _CellStyle.get(header or j in header_columns)
+                if (c._style is not plain or c._row_span != 1 or
+                        c._col_span != 1):
+                    style = styles.setdefault(c._style, len(styles))
+                    cells.append([i, j, style, c._row_span, c._col_span])
+    def value(c):
+        if c is _COVERED:
+            return ''
+        return c._value if isinstance(c, TableCell) else c
+    n = len(rows)
+    widths = None
+    if store is not None:
+        start = rows[0]._index
+        columns = []
+        for col, length in zip(store.columns, store.lengths):
+            if start == 0 and length == n:
+                columns.append(col)
+            else:
+                part = col[start:start + n]
+                if len(part) < n:
+                    part = list(part) + [''] * (n - len(part))
+                columns.append(part)
+        patched = {}
+        for i in range(n):
+            override = store.cells.get(start + i)
+            if override:
+                add_cells(i, override.items())
+                for j, c in override.items():
+                    v, current = value(c), columns[j][i]
+                    if v is current or (type(v) is type(current) and
+                                        v == current):
+                        continue # e.g. a cell made to set its colours
+                    if j not in patched:
+                        patched[j] = columns[j] = list(columns[j])
+                    columns[j][i] = v
+    else:
+        lists = []
+        for i, row in enumerate(rows):
+            slots = row._slots
+            for c in slots:
+                if isinstance(c, TableCell) or c is _COVERED:
+                    add_cells(i, enumerate(slots))
+                    slots = [value(c) for c in slots]
+                    break
+            lists.append(slots)
+        columns = list(zip_longest(*lists, fillvalue=''))
+        widths = [len(slots) for slots in lists]
+        if all(w == len(columns) for w in widths):
+            widths = None
+    descs = []
+    for col in columns:
+        desc, offset = _pack_column(col, chunks, offset)
+        descs.append(desc)
+    return {'rows': n, 'header': header,
+            'header_columns': sorted(header_columns), 'widths': widths,
+            'columns': descs, 'cells': cells, 'covered': covered}, offset
+
+# Tables being rendered by render(..., executor='process'), by key. Worker
+# processes are forked after a table is added, so they find it here.
+_render_sources = {}
+_render_keys = count()
+
+def _render_chunk_in_worker(key, fmt, start, stop):
+    return _render_sources[key]._render_chunk(fmt, start, stop)
+
+def _warn_latex_packages(packages):
+    "Warn once about the LaTeX packages some output needs, if any."
+    if packages:
+        warnings.warn('Must use the %s package%s in the .tex file, e.g. '
+                      r'"\usepackage{%s}"' % (', '.join(sorted(packages)),
+                      's' if len(packages) > 1 else '',
+                      ','.join(sorted(packages))))
+
+class MemoryBudgetError(MemoryError):
+    "Raised when a table would use more memory than its memory_budget."
+
+_pointer_size = struct.calcsize('P')
+_render_caches = ('_html_cache', '_html_compact_cache', '_latex_cache',
+                  '_text_cache')
+
+def _sizeof_deep(value, seen):
+    """The size of value in bytes, including the lists, tuples, sets, dicts
+    and Deferred values in it, counting objects whose id() is in seen as 0
+    and adding the others to it."""
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    t = type(value)
+    if t is dict:
+        for key, item in value.items():
+            size += _sizeof_deep(key, seen) + _sizeof_deep(item, seen)
+    elif t is list or t is tuple or t is set or t is frozenset:
+        for item in value:
+            size += _sizeof_deep(item, seen)
+    elif t is Deferred:
+        size += _sizeof_deep(value._text, seen)
+        if value.evaluated:
+            size += _sizeof_deep(value._value, seen)
+    return size
+
+def _column_sizeof(column, deep, seen):
+    "The size of a column buffer in a _ColumnStore, in bytes."
+    if type(column) is list:
+        size = sys.getsizeof(column)
+        if deep:
+            for value in column:
+                size += _sizeof_deep(value, seen)
+        return size
+    size = sys.getsizeof(column)
+    if getattr(column, 'base', None) is not None:
+        # A NumPy view, of a 2D array or a loaded table
+        size += column.nbytes
+    if isinstance(column, (_StringColumn, _BlankedColumn)):
+        size += sum(sys.getsizeof(part) for part in vars(column).values())
+    return size
+
+def _row_usage(row, deep, seen, styles):
+    """The memory used by a row, as a list of bytes in rows, cells,
+    placeholders, values and rendered; see Table.memory_usage(). Styles of
+    its cells are added to the dict styles."""
+    getsizeof = sys.getsizeof
+    usage = [getsizeof(row), 0, 0, 0, 0]
+    store = getattr(row, '_store', None)
+    if store is None:
+        items = row._slots
+        usage[0] += getsizeof(items)
+    else:
+        items = store.cells.get(row._index, {}).values()
+    for c in items:
+        if c is _COVERED:
+            usage[2] += _pointer_size
+        elif isinstance(c, TableCell):
+            usage[1] += getsizeof(c)
+            styles[id(c._style)] = c._style
+            if deep:
+                usage[3] += _sizeof_deep(c._value, seen)
+        elif deep:
+            usage[3] += _sizeof_deep(c, seen)
+    for attr in _render_caches:
+        cache = getattr(row, attr)
+        if cache is not None:
+            # The layout entries in it are counted with the layout
+            usage[4] += getsizeof(cache) + _sizeof_deep(cache[1], seen)
+    if row._formatted is not None:
+        usage[4] += _sizeof_deep(row._formatted, seen)
+    return usage
+
+_line_breaks = re.compile(r'\r\n|[\r\n]')
+_csv_special = re.compile(r'[,"\r\n]')
+
+def _one_line(text):
+    "Text for a cell of plain text output, with line breaks made spaces."
+    if '\n' in text or '\r' in text:
+        return _line_breaks.sub(' ', text)
+    return text
+
+def _markdown_cell(text):
+    "Text for a cell of a Markdown table."
+    return _one_line(text).replace('|', '\\|')
+
+def _csv_field(text):
+    "Quote text for CSV if needed, as the csv module does by default."
+    if _csv_special.search(text):
+        return '"%s"' % text.replace('"', '""')
+    return text
+
+def _unspanned(cells):
+    """The texts of a row from TableRow._text(), one per column, with the
+    text of a cell spanning several columns in the first of them."""
+    texts = []
+    for cs, text in cells:
+        texts.append(text)
+        if cs > 1:
+            texts.extend([''] * (cs - 1))
+    return texts
+
+# Formats showing colours, and so the styles from style rules
+_styled_formats = ('html', 'html_compact')
+
+def _numeric_array(values):
+    """values as a NumPy array if NumPy is installed and they are all
+    numbers, or None."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    if not len(values):
+        return None
+    values = numpy.asarray(values)
+    return values if values.dtype.kind in 'iuf' else None
+
+def _finite_number(value):
+    "Whether value is a number which isn't infinite or NaN."
+    return (isinstance(value, Number) and not isinstance(value, bool) and
+            value == value and abs(value) != float('inf'))
+
+def _parse_colour(colour):
+    "The (red, green, blue) levels of a '#rrggbb' or '#rgb' colour."
+    match = re.match(r'#([0-9a-fA-F]{3}){1,2}$', colour)
+    if match is None:
+        raise ValueError("Colour scales need '#rrggbb' or '#rgb' colours, "
+                         "not %r" % (colour,))
+    digits = colour[1:]
+    if len(digits) == 3:
+        digits = ''.join(d * 2 for d in digits)
+    return tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+
+class StyleRule(object):
+    """Base class for rules colouring cells by the values in their column;
+    see Table.add_style_rule().
+
+    columns lists the columns a rule applies to, by position or name, or is
+    None for all of them. Subclasses define evaluate(values), which is given
+    the values in a column of the rows other than header rows - a list, or a
+    NumPy array if NumPy is installed and they are all numbers - and returns
+    (bg_colours, text_colours). Each of those is a sequence holding a colour
+    or None for each value, or None to set no colours of that kind.
+    """
+    columns = None
+
+    def evaluate(self, values):
+        raise NotImplementedError
+
+class Highlight(StyleRule):
+    """Colour the cells in a column with values above and/or below the
+    given thresholds, or for which test(value) is true.
+
+    Thresholds are exclusive; values that can't be compared with them, like
+    blanks, aren't coloured."""
+    def __init__(self, col, above=None, below=None, test=None,
+                 bg_colour=None, text_colour=None):
+        self.columns = [col]
+        self.above = above
+        self.below = below
+        self.test = test
+        self.bg_colour = bg_colour
+        self.text_colour = text_colour
+
+    def _matches(self, values):
+        above, below, test = self.above, self.below, self.test
+        numbers = _numeric_array(values) if test is None else None
+        if numbers is not None:
+            matches = numbers == numbers # Not NaN
+            if above is not None:
+                matches &= numbers > above
+            if below is not None:
+                matches &= numbers < below
+            return matches.tolist()
+        matches = []
+        for value in values:
+            try:
+                match = ((above is None or value > above) and
+                         (below is None or value < below) and
+                         (test is None or test(value)))
+            except TypeError:
+                match = False
+            matches.append(bool(match))
+        return matches
+
+    def evaluate(self, values):
+        matches = self._matches(values)
+        def colours(colour):
+            if colour is None:
+                return None
+            return [colour if match else None for match in matches]
+        return colours(self.bg_colour), colours(self.text_colour)
+
+class ColourScale(StyleRule):
+    """Shade the cells in a column by their values, going from the first of
+    colours at vmin to the last at vmax, through any in between.
+
+    vmin and vmax default to the smallest and largest values in the column,
+    and values outside them get the end colours. Colours are '#rrggbb' or
+    '#rgb' strings. Values that aren't numbers, and NaNs, aren't shaded.
+    The scale has steps distinct colours."""
+    steps = 256
+
+    def __init__(self, col, colours=('#f8696b', '#ffeb84', '#63be7b'),
+                 vmin=None, vmax=None):
+        if len(colours) < 2:
+            raise ValueError("A colour scale needs at least two colours")
+        self.columns = [col]
+        self.vmin = vmin
+        self.vmax = vmax
+        levels = [_parse_colour(c) for c in colours]
+        self.palette = []
+        for i in range(self.steps):
+            position = i * (len(levels) - 1) / float(self.steps - 1)
+            k = min(int(position), len(levels) - 2)
+            f = position - k
+            self.palette.append('#%02x%02x%02x' % tuple(
+                int(round(a + (b - a) * f))
+                for a, b in zip(levels[k], levels[k + 1])))
+
+    def _range(self, finite_values):
+        vmin, vmax = self.vmin, self.vmax
+        if vmin is None:
+            vmin = min(finite_values)
+        if vmax is None:
+            vmax = max(finite_values)
+        return vmin, float(vmax - vmin) or 1.0
+
+    def evaluate(self, values):
+        top = self.steps - 1
+        numbers = _numeric_array(values)
+        if numbers is not None:
+            import numpy
+            finite = numpy.isfinite(numbers)
+            if not finite.any():
+                return None, None
+            vmin, span = self._range(numbers[finite])
+            scaled = numpy.clip((numbers - vmin) / span, 0, 1)
+            steps = numpy.rint(numpy.where(finite, scaled, 0) * top)
+            steps = steps.astype(int)
+            steps[~finite] = self.steps
+            palette = numpy.array(self.palette + [None], dtype=object)
+            return palette[steps].tolist(), None
+        finite = [v for v in values if _finite_number(v)]
+        if not finite:
+            return None, None
+        vmin, span = self._range(finite)
+        palette = self.palette
+        return [palette[int(round(min(max((v - vmin) / span, 0), 1) * top))]
+                if _finite_number(v) else None for v in values], None
+
+class StripeRows(StyleRule):
+    """Colour every other row, starting from the second row after the header
+    rows. Stripes go by position in the table, so they aren't even in
+    sorted or filtered views."""
+    def __init__(self, bg_colour='#f2f2f2', text_colour=None):
+        self.bg_colour = bg_colour
+        self.text_colour = text_colour
+
+    def evaluate(self, values):
+        n = len(values)
+        def colours(colour):
+            if colour is None:
+                return None
+            return [None, colour] * (n // 2) + [None] * (n % 2)
+        return colours(self.bg_colour), colours(self.text_colour)
+
+class _RuleStyles(object):
+    """The colours given by the style rules of a table, kept a column at a
+    time.
+
+    colours maps columns to (bg_colours, text_colours), either of which may
+    be None, with a colour or None for each body row - the rows other than
+    header rows. Cell styles are only made for the rows being rendered:
+    styles[r] is None or a {column: _CellStyle} dict for row r, with any
+    colours set on the cells taking precedence."""
+    def __init__(self, rows, body, colours):
+        self.rows = rows
+        self.nrows = len(rows)
+        # The position of a row among the body rows: body is the first body
+        # row if they run to the end of the table, or a {row: position} dict
+        self._body = body
+        self.colours = colours
+
+    def __getitem__(self, r):
+        body = self._body
+        if type(body) is dict:
+            i = body.get(r)
+            if i is None:
+                return None
+        elif r < body:
+            return None
+        else:
+            i = r - body
+        styles = None
+        row = self.rows[r]
+        get_style = _CellStyle.get
+        for col, (bgs, texts) in self.colours.items():
+            bg = bgs[i] if bgs is not None else None
+            text = texts[i] if texts is not None else None
+            if bg is None and text is None:
+                continue
+            c = row._slot(col)
+            if isinstance(c, TableCell):
+                header, cell_bg, cell_text = c._style
+                bg, text = cell_bg or bg, cell_text or text
+            else:
+                header = row._header or col in row._header_columns
+            if styles is None:
+                styles = {}
+            styles[col] = get_style(header, bg, text)
+        return styles
+
+    def distinct(self):
+        "The different styles given to cells, for compact HTML."
+        pairs = set()
+        for bgs, texts in self.colours.values():
+            pairs.update(zip(bgs if bgs is not None else repeat(None),
+                             texts if texts is not None else repeat(None)))
+        pairs.discard((None, None))
+        styles = [_CellStyle.get(False, bg, text) for bg, text in pairs]
+        # Colours set on cells are mixed with those from the rules
+        for r in range(self.nrows):
+            if any(True for c in self.rows[r]._styled_cells()):
+                row_styles = self[r]
+                if row_styles:
+                    styles.extend(row_styles.values())
+        return styles
+
+    def sizeof(self, seen):
+        "The memory used by the colours, as for Table.memory_usage()."
+        size = sys.getsizeof(self) + _sizeof_deep(self._body, seen)
+        for pair in self.colours.values():
+            for colours in pair:
+                if colours is not None:
+                    size += (_sizeof_deep(colours, seen) if type(colours) is
+                             list else sys.getsizeof(colours))
+        return size
+
+# Whether the current thread is rendering a table for display, in one of the
+# _repr_*_ methods. Only then are rendered rows kept in the row caches, so
+# that exporting a large table through iter_*, write_to() or render() doesn't
+# leave a copy of its output behind.
+_displaying = threading.local()
+
+def _display(method):
+    "Decorate a _repr_*_ method so that the rows it renders are cached."
+    def wrapper(self, *args):
+        if getattr(_displaying, 'on', False):
+            return method(self, *args)
+        _displaying.on = True
+        try:
+            return method(self, *args)
+        finally:
+            _displaying.on = False
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+class _TableBase(object):
+    """Rendering shared by Table and TableView.
+
+    Subclasses provide rows, has_header, _profiler, _column_count(),
+    _blocks(), which gives the ranges of table rows that sort_by() and
+    filter() move as a whole, and _iter_rows(fmt, prof), which yields the
+    rendered rows in the given format."""
+    # Tables with fewer rows than this are always rendered in one go by
+    # render(), whatever the number of workers.
+    parallel_min_rows = 10000
+
+    def _rows(self, fmt):
+        "The rendered rows, collecting timings if the table is profiled."
+        prof = self._profiler
+        if prof is None:
+            return self._iter_rows(fmt)
+        return prof._render(self, fmt)
+
+    def _head(self, fmt):
+        "The text before the first row in the given format."
+        if fmt == 'html':
+            return '<table>\n'
+        if fmt == 'html_compact':
+            return self._compact_head()
+        env = 'longtable' if fmt == 'longtable' else 'tabular'
+        latex = '\\begin{%s}{*{%d}{l}}\n' % (env, self._column_count())
+        # Top horizontal line of table
+        latex += r'\hline' + '\n' if self.has_header else ''
+        return latex
+
+    def _foot(self, fmt):
+        "The text after the last row in the given format."
+        if fmt in ('html', 'html_compact'):
+            return '</table>'
+        #Bottom horizontal line of table
+        latex = r'\hline' + '\n' if self.has_header else ''
+        # Finish table
+        env = 'longtable' if fmt == 'longtable' else 'tabular'
+        return latex + '\\end{%s}' % env
+
+    def iter_html(self):
+        """Generate the HTML for the table in fragments, one per row.
+
+        Joining the fragments gives the same output as ``_repr_html_``, except
+        that the max_rows and max_cols display limits only apply to the
+        latter. The whole document never has to be held in memory at once."""
+        yield self._head('html')
+        for html in self._rows('html'):
+            yield html + '\n'
+        yield self._foot('html')
+
+    def _styled_cells(self):
+        "The cells with colours set in the rows to be rendered."
+        for row in self.rows:
+            for c in row._styled_cells():
+                yield c
+
+    def _rule_style_set(self):
+        "The styles given to cells by style rules."
+        rule_styles = getattr(self, 'table', self)._rule_styles()
+        return rule_styles.distinct() if rule_styles is not None else ()
+
+    def _compact_head(self):
+        """Open the table for compact HTML, after a <style> block defining
+        the colour classes used by its cells, scoped to tabipy tables."""
+        styles = {}
+        for c in self._styled_cells():
+            styles.setdefault(c._style.css_class(), c._style)
+        for style in self._rule_style_set():
+            styles.setdefault(style.css_class(), style)
+        if not styles:
+            return '<table>\n'
+        # The class names stand for their colours, so the rules from
+        # different tables on a page never conflict
+        rules = ''.join('.tabipy .%s{%s}\n' % (name, styles[name].css(';'))
+                        for name in sorted(styles))
+        return '<style>\n%s</style>\n<table class="tabipy">\n' % rules
+
+    def iter_html_compact(self):
+        """Generate compact HTML for the table in fragments, one per row.
+
+        Cell colours are set by classes defined once in a <style> block for
+        the table, rather than in a style attribute on every cell, and tags
+        have no padding whitespace. It displays the same as iter_html()."""
+        yield self._head('html_compact')
+        for html in self._rows('html_compact'):
+            yield html + '\n'
+        yield self._foot('html_compact')
+
+    def _text_widths(self, clean, gap):
+        """Column widths for text output, found in one pass over the rows,
+        and the rendered rows, so the caller needn't render them again.
+
+        clean makes the text shown for a cell. A cell spanning several
+        columns is fitted across them, with gap characters between each; if
+        gap is None, its text only goes in the first of them."""
+        widths = [0] * self._column_count()
+        spanning = []
+        rows = []
+        for cells in self._rows('text'):
+            rows.append(cells)
+            col = 0
+            for cs, text in cells:
+                if col + cs > len(widths):
+                    widths.extend([0] * (col + cs - len(widths)))
+                n = len(clean(text))
+                if cs == 1 or gap is None:
+                    if n > widths[col]:
+                        widths[col] = n
+                else:
+                    spanning.append((col, cs, n))
+                col += cs
+        for col, cs, n in spanning:
+            short = n - sum(widths[col:col + cs]) - gap * (cs - 1)
+            if short > 0:
+                widths[col + cs - 1] += short
+        return widths, rows
+
+    def iter_text(self):
+        """Generate the table as plain text in fragments, one line per row.
+
+        Columns are padded to the width of their longest value, which is
+        found in a first pass over the rows. The text of the rows is kept
+        from that pass until the export is done, so each value is only
+        converted once. A cell spanning several columns is written across
+        them, and the header rows at the start of the table are underlined."""
+        widths, rows = self._text_widths(_one_line, 2)
+        nhead = self._leading_headers()
+        for i, cells in enumerate(rows):
+            parts = []
+            col = 0
+            for cs, text in cells:
+                width = sum(widths[col:col + cs]) + 2 * (cs - 1)
+                parts.append(_one_line(text).ljust(width))
+                col += cs
+            yield '  '.join(parts).rstrip() + '\n'
+            if i + 1 == nhead:
+                yield '  '.join('-' * w for w in widths) + '\n'
+
+    def iter_markdown(self):
+        """Generate the table as Markdown in fragments, one line per row.
+
+        The first row is the Markdown header if the table starts with a
+        header row, and the header is left blank if not. Markdown tables
+        can't span cells, so the text of a spanning cell goes in its first
+        column, and the others it covers are left blank."""
+        widths, rows = self._text_widths(_markdown_cell, None)
+        widths = [max(w, 3) for w in widths]
+        def line(texts):
+            texts = texts + [''] * (len(widths) - len(texts))
+            return '| %s |\n' % ' | '.join(_markdown_cell(text).ljust(w)
+                                           for text, w in zip(texts, widths))
+        rule = '| %s |\n' % ' | '.join('-' * w for w in widths)
+        header = self._leading_headers() > 0
+        if not header:
+            yield line([])
+            yield rule
+        for i, cells in enumerate(rows):
+            yield line(_unspanned(cells))
+            if header and i == 0:
+                yield rule
+
+    def iter_csv(self):
+        """Generate the table as CSV in fragments, one line per row.
+
+        This takes a single pass over the rows. Values are quoted where
+        needed, and the text of a cell spanning several columns goes in the
+        first of them, with the others left blank."""
+        for cells in self._rows('text'):
+            yield ','.join([_csv_field(text)
+                            for text in _unspanned(cells)]) + '\n'
+
+    def _to(self, fmt, fileobj):
+        if fileobj is None:
+            return ''.join(self._iter_format(fmt))
+        return self.write_to(fileobj, fmt)
+
+    def to_text(self, fileobj=None):
+        """Return the table as plain text (see iter_text), or write it to
+        fileobj and return the number of characters written."""
+        return self._to('text', fileobj)
+
+    def to_markdown(self, fileobj=None):
+        """Return the table as a Markdown table (see iter_markdown), or
+        write it to fileobj and return the number of characters written."""
+        return self._to('markdown', fileobj)
+
+    def to_csv(self, fileobj=None):
+        """Return the table as CSV (see iter_csv), or write it to fileobj
+        and return the number of characters written."""
+        return self._to('csv', fileobj)
+
+    def html_bytes_saved(self):
+        """How many bytes smaller the compact HTML for the table is than the
+        default HTML, measured without holding either in memory."""
+        # Both contain the same values, so the difference is all ASCII markup
+        # and the same whether counted in characters or UTF-8 bytes.
+        return (sum(map(len, self.iter_html())) -
+                sum(map(len, self.iter_html_compact())))
+
+    def _leading_headers(self):
+        "The number of header rows at the start of the table."
+        nhead = 0
+        for row in self.rows:
+            if not isinstance(row, TableHeaderRow):
+                break
+            nhead += 1
+        return nhead
+
+    def sort_by(self, col, key=None, reverse=False):
+        """Return a TableView of the rows sorted by the values in a column,
+        given by position or by name.
+
+        key and reverse work as for sorted(). Rows tied together by row spans
+        are moved as a block, by the value in their first row, and header
+        rows at the start of the table stay at the top. Rows with no value in
+        the column, either None or a blank, go last in their original order,
+        and key is only called for the others. No rows or cells are copied."""
+        source = getattr(self, 'table', self)
+        values = source._column_values(source._column_index(col))
+        present, missing = [], []
+        for block in self._blocks():
+            value = values[block[0]]
+            if value is None or value == '':
+                missing.append(block)
+            else:
+                present.append(block)
+        if key is None:
+            block_key = lambda block: values[block[0]]
+        else:
+            block_key = lambda block: key(values[block[0]])
+        blocks = sorted(present, key=block_key, reverse=reverse)
+        return source._view_of(blocks + missing)
+
+    def filter(self, predicate):
+        """Return a TableView of the rows for which predicate(values) is
+        true, where values is a list of the values in the row.
+
+        Rows tied together by row spans are kept or dropped as a block: they
+        are kept if predicate is true for any of them. Header rows at the
+        start of the table are always kept."""
+        source = getattr(self, 'table', self)
+        layout = source._get_layout()
+        rows = source.rows
+        entries = layout.entries
+        kept = [block for block in self._blocks()
+                if any(predicate(_row_values(rows[r], entries[r], layout, r))
+                       for r in range(*block))]
+        return source._view_of(kept)
+
+    def _iter_latex_rows(self, packages):
+        """Render each row as LaTeX followed by a newline, adding the
+        packages needed by the output to the set packages."""
+        for latex in self._rows('latex'):
+            if '\\multirow{' in latex:
+                packages.add('multirow')
+            yield latex + '\n'
+
+    def iter_latex(self):
+        """Generate the LaTeX for the table in fragments, one per row.
+
+        Joining the fragments gives the same output as ``_repr_latex_``. If
+        the output needs the multirow package, this is warned about once, at
+        the end."""
+        packages = set()
+        yield self._head('latex')
+        # Fill table contents
+        for latex in self._iter_latex_rows(packages):
+            yield latex
+        yield self._foot('latex')
+        _warn_latex_packages(packages)
+
+    def iter_longtable(self):
+        """Generate the table as a LaTeX longtable, in fragments.
+
+        Unlike a tabular, a longtable can be broken across pages, so this
+        works for tables too long for one. Header rows at the start of the
+        table are repeated at the top of each page."""
+        packages = set(['longtable'])
+        nhead = self._leading_headers()
+        yield self._head('longtable')
+        for i, latex in enumerate(self._iter_latex_rows(packages)):
+            yield latex
+            if i + 1 == nhead:
+                yield '\\endhead\n'
+        yield self._foot('longtable')
+        _warn_latex_packages(packages)
+
+    def render(self, fmt='html', workers=None, executor='thread',
+               chunk_rows=None):
+        """Render the whole table as a string in the given format.
+
+        With workers > 1, the rows are split into chunks of chunk_rows rows
+        which are rendered in a pool of that many workers and joined in
+        order. executor is 'thread', or 'process' for a pool of processes
+        forked from this one, which see the table without it being copied or
+        pickled (not available on Windows). The output is the same as
+        rendering in one go, which is also what happens for tables with fewer
+        than parallel_min_rows rows, and on Python 2 without the futures
+        package. The memory_budget of the table is only checked when
+        rendering in one go."""
+        nrows = len(self.rows)
+        try:
+            from concurrent import futures
+        except ImportError: # Python 2 without the futures backport
+            futures = None
+        if (not workers or workers < 2 or nrows < self.parallel_min_rows
+                or not hasattr(self, '_render_chunk') or futures is None
+                or fmt not in ('html', 'html_compact', 'latex')):
+            return self._joined(self._iter_format(fmt))
+        if chunk_rows is None:
+            chunk_rows = -(-nrows // (workers * 4))
+        starts = range(0, nrows, chunk_rows)
+        stops = [min(start + chunk_rows, nrows) for start in starts]
+        # Shared by all the chunks, and by forked workers
+        self._get_layout()
+        if fmt in _styled_formats:
+            self._rule_styles()
+        if executor == 'thread':
+            with futures.ThreadPoolExecutor(workers) as pool:
+                parts = list(pool.map(self._render_chunk, repeat(fmt),
+                                      starts, stops))
+        elif executor == 'process':
+            import multiprocessing
+            key = next(_render_keys)
+            _render_sources[key] = self
+            try:
+                if sys.version_info >= (3, 7):
+                    pool = futures.ProcessPoolExecutor(workers,
+                        mp_context=multiprocessing.get_context('fork'))
+                else:
+                    # The pool uses the default start method, which is to
+                    # fork on Linux and macOS before Python 3.8
+                    pool = futures.ProcessPoolExecutor(workers)
+                with pool:
+                    parts = list(pool.map(_render_chunk_in_worker,
+                                          repeat(key), repeat(fmt),
+                                          starts, stops))
+            finally:
+                del _render_sources[key]
+        else:
+            raise ValueError("executor must be 'thread' or 'process', not %r"
+                             % (executor,))
+        body = ''.join(parts)
+        if fmt == 'latex' and '\\multirow{' in body:
+            _warn_latex_packages(['multirow'])
+        return self._head(fmt) + body + self._foot(fmt)
+
+    _renderers = {'html': 'iter_html', 'html_compact': 'iter_html_compact',
+                  'latex': 'iter_latex', 'longtable': 'iter_longtable',
+                  'text': 'iter_text', 'markdown': 'iter_markdown',
+                  'csv': 'iter_csv'}
+
+    def _iter_format(self, fmt):
+        try:
+            method = self._renderers[fmt]
+        except KeyError:
+            raise ValueError("Unknown output format %r, expected one of: %s"
+                             % (fmt, ', '.join(sorted(self._renderers))))
+        return getattr(self, method)()
+
+    def _joined(self, fragments):
+        """Join rendered fragments, checking the memory_budget of the table
+        as they are made."""
+        source = getattr(self, 'table', self)
+        if source.memory_budget is not None:
+            fragments = source._budgeted(fragments)
+        return ''.join(fragments)
+
+    def write_to(self, fileobj, fmt='html'):
+        """Stream the table to a file-like object.
+
+        fmt is 'html', 'html_compact', 'latex', 'longtable', 'text',
+        'markdown' or 'csv'. Fragments are written as they are rendered, so
+        large tables can go straight to a file or socket without building the
+        complete document first. Returns the number of characters written."""
+        write = fileobj.write
+        written = 0
+        for fragment in self._iter_format(fmt):
+            write(fragment)
+            written += len(fragment)
+        return written
+
+    @_display
     def _repr_latex_(self):
-        return super(TableHeaderRow, self)._repr_latex_() + '\\\nhline'
+        return self._joined(self.iter_latex())
+
+    @_display
+    def _repr_pretty_(self, p, cycle):
+        p.text(self._joined(self.iter_text()).rstrip('\n'))
+
+class Table(_TableBase):
+    # Rendering reads the table without changing it, apart from replacing
+    # the cached layout and row output in single assignments, so one table
+    # can be rendered from several threads at once.
+
+    # Keep the rendered output of each row when the table is displayed, and
+    # only re-render rows that have changed. Exports aren't cached. Set to
+    # False to save memory when displaying very large tables.
+    cache_renders = True
+    # Display limits for the notebook (_repr_html_). Larger tables show their
+    # first and last rows and columns with '...' in between. None for no limit.
+    max_rows = 100
+    max_cols = 50
+    # The RenderProfile collecting timings, while in a profile() block
+    _profiler = None
+    _last_profile = None
+    # Use compact HTML (see iter_html_compact) for display in the notebook.
+    compact_html = False
+    # Split the LaTeX for _repr_latex_ into tabulars of about this many rows
+    # (see iter_latex_chunks). None for a single tabular.
+    latex_chunk_rows = None
+    # Raise MemoryBudgetError when loading rows (in the constructors and
+    # extend_rows), render() or displaying the table would take its memory,
+    # as estimated by memory_usage(), over this many bytes. None for no limit.
+    memory_budget = None
+    # Warn instead of raising, and carry on.
+    memory_budget_warn = False
 
-class Table(object):
     def __init__(self, *rows):
         self.rows = []
         self.has_header = False
+        self._layout = None
+        self._cache_hits = self._cache_misses = 0
+        self._formats = {} # Formatters for displayed values, by column
+        self._indexes = {} # Column indexes, as {column: (nrows, index)}
+        self._style_rules = []
+        self._rule_cache = None # From _rule_styles()
+        # The last estimate of memory_usage().total for the memory_budget,
+        # as (rows, bytes)
+        self._budget_used = None
 
         # if argument is a single dict, convert it to a table with keys
         # as header
         if (len(rows) == 1) and isinstance(rows[0], Mapping):
             dict_arg = rows[0]
-            new_rows = [TableHeaderRow(*dict_arg.keys())]
-            new_rows.extend(zip_longest(*dict_arg.values(), fillvalue=''))
-            rows = new_rows
-        max_len = None
-        for index, r in enumerate(rows):
-        
-            self.append_row(r, max_len)
-            if index==0:
-                max_len = self.rows[0].column_count()
-            
+            self.append_row(TableHeaderRow(*dict_arg.keys()))
+            self._extend_columns(dict_arg.values())
+            return
+        self.extend_rows(rows)
+
+    @classmethod
+    def from_columns(cls, columns, header=None, formats=None,
+                     _header_columns=()):
+        """Make a table from a sequence of columns.
+
+        Each column can be a list, an array.array, a NumPy array or any other
+        indexable sequence; the table keeps references to them rather than
+        copying the values into cells. If header is given, it is used as a
+        header row. formats maps column names or positions to format specs,
+        as for set_format(), applied when the table is rendered."""
+        table = cls()
+        if header is not None:
+            table.append_row(TableHeaderRow(*header))
+        table._extend_columns(columns, _header_columns)
+        for col, spec in (formats or {}).items():
+            table.set_format(col, spec)
+        return table
+
+    @classmethod
+    def from_array(cls, array, header=None, formats=None):
+        """Make a table from a 1 or 2 dimensional NumPy array.
+
+        Each column of the table is a view of a column of the array, so no
+        values are copied."""
+        ndim = getattr(array, 'ndim', None)
+        if ndim == 1:
+            columns = [array]
+        elif ndim == 2:
+            columns = [array[:, j] for j in range(array.shape[1])]
+        else:
+            raise ValueError("Expected a 1 or 2 dimensional array")
+        return cls.from_columns(columns, header=header, formats=formats)
+
+    @classmethod
+    def from_dataframe(cls, df, index=True, header=True, formats=None):
+        """Make a table from a pandas DataFrame.
+
+        The table refers to the arrays behind the frame's columns rather than
+        copying values. With header=True, the column names form a header row.
+        With index=True, the index is added as a first column shown as header
+        cells."""
+        columns = [df.iloc[:, j].values for j in range(df.shape[1])]
+        names = list(df.columns)
+        header_columns = ()
+        if index:
+            columns.insert(0, df.index.values)
+            names.insert(0, '' if df.index.name is None else df.index.name)
+            header_columns = (0,)
+        return cls.from_columns(columns, header=names if header else None,
+                                formats=formats,
+                                _header_columns=header_columns)
+
+    @classmethod
+    def from_records(cls, records, columns=None, header=True, formats=None):
+        """Make a table from an iterable of records.
+
+        Records can be mappings, namedtuples or plain sequences; a NumPy
+        record array is used column by column without copying. columns picks
+        and orders the fields (required to name the columns of plain
+        sequences). With header=True, the field names form a header row."""
+        names = getattr(getattr(records, 'dtype', None), 'names', None)
+        if names:
+            names = list(columns or names)
+            cols = [records[name] for name in names]
+        else:
+            records = iter(records)
+            first = next(records, None)
+            if first is None:
+                names, cols = list(columns or []), []
+            elif isinstance(first, Mapping):
+                names = list(columns or first.keys())
+                cols = [[] for name in names]
+                for record in chain([first], records):
+                    for col, name in zip(cols, names):
+                        col.append(record.get(name, ''))
+            else:
+                names = list(columns or getattr(first, '_fields', []))
+                cols = [list(col) for col in
+                        zip_longest(first, *records, fillvalue='')]
+                if not cols:
+                    cols = [[]] * len(names)
+        return cls.from_columns(cols, header=names if header and names
+                                else None, formats=formats)
+
+    def _column_index(self, col):
+        """Return the position of a column given by position or by its name
+        in the first header row."""
+        if isinstance(col, int):
+            return col
+        for row in self.rows:
+            if isinstance(row, TableHeaderRow):
+                names = [c._value if isinstance(c, TableCell) else c
+                         for c in row._slots]
+                if col in names:
+                    return names.index(col)
+                break
+        raise KeyError("No column named %r" % (col,))
+
+    def set_format(self, col, spec):
+        """Set how values in a column are displayed.
+
+        col is a column position or a name from the header row. spec can be a
+        callable, a str.format template like '{:,.2f}', a printf-style
+        template like '%.3f' (which also takes strftime codes for dates) or a
+        format spec for format() like '.1%'. Values are formatted when
+        rendered, and the values held in the table are left as they are.
+        Header rows are not formatted. Pass None to remove the format.
+
+        Formatted values are kept for later renders until the cell changes.
+        Columns of tables built from NumPy arrays are formatted a block at a
+        time, in one operation for numeric printf-style formats."""
+        col = self._column_index(col)
+        if spec is None:
+            self._formats.pop(col, None)
+        else:
+            self._formats[col] = _formatter(spec)
+        self._drop_rendered()
+
+    def _extend_columns(self, columns, header_columns=()):
+        "Add rows backed by a _ColumnStore holding the given columns."
+        store = _ColumnStore(columns, header_columns)
+        for index in range(store.nrows):
+            row = _ColumnRow(store, index)
+            row.set_parent(self)
+            self.rows.append(row)
+        self._layout = None
+        if self.memory_budget is not None:
+            used = self._usage_estimate()
+            if used > self.memory_budget:
+                self._over_budget(used, 'loading columns')
+        return store
+
+    def to_bytes(self):
+        """Serialise the table in a compact binary format, for from_bytes().
+
+        Values are stored column by column: integers, floats and strings as
+        binary arrays, NumPy columns as their raw data, and columns of other
+        values are pickled. Cell colours and header flags are stored once
+        for each distinct style, and only cells that differ from a plain
+        value are listed, with their spans. Formats set with set_format()
+        are not saved. This needs Python 3."""
+        if not PY3:
+            raise NotImplementedError("Table.to_bytes() needs Python 3")
+        styles = {}
+        chunks = []
+        offset = 0
+        blocks = []
+        for key, rows in _row_blocks(self.rows):
+            block, offset = _pack_block(key, rows, styles, chunks, offset)
+            blocks.append(block)
+        header = json.dumps({
+            'version': 1,
+            'byteorder': sys.byteorder,
+            'styles': [list(style) for style, n in
+                       sorted(styles.items(), key=lambda item: item[1])],
+            'blocks': blocks,
+        }).encode('utf-8')
+        header += b' ' * _pad8(len(header))
+        return b''.join([_MAGIC, struct.pack('<Q', len(header)), header]
+                        + chunks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Make a table from the output of to_bytes().
+
+        data can be a bytes object, or any buffer such as a memory-mapped file
+        (see load()). Rows whose columns are all numbers or strings read them
+        from the buffer as they are rendered, rather than copying them. As
+        with pickle, only load data from a trusted source. This needs
+        Python 3."""
+        if not PY3:
+            raise NotImplementedError("Table.from_bytes() needs Python 3")
+        data = memoryview(data)
+        if bytes(data[:8]) != _MAGIC:
+            raise ValueError("Not a table saved by Table.to_bytes()")
+        length, = struct.unpack('<Q', bytes(data[8:16]))
+        meta = json.loads(bytes(data[16:16 + length]).decode('utf-8'))
+        data = data[16 + length:]
+        styles = [_CellStyle.get(*style) for style in meta['styles']]
+        table = cls()
+        for block in meta['blocks']:
+            columns = [_unpack_column(desc, data, meta['byteorder'])
+                       for desc in block['columns']]
+            n = block['rows']
+            widths = block['widths']
+            if block['header'] or widths is not None:
+                # Few rows, or rows of different lengths: load them as lists
+                row_cls = TableHeaderRow if block['header'] else TableRow
+                rows = []
+                for i in range(n):
+                    values = [col[i] for col in columns]
+                    if widths is not None:
+                        del values[widths[i]:]
+                    rows.append(row_cls.from_values(values))
+                table.extend_rows(rows)
+                place = lambda i, j, c: rows[i]._set_slot(j, c)
+            else:
+                store = table._extend_columns(columns,
+                                              block['header_columns'])
+                rows = table.rows[len(table.rows) - n:]
+                def place(i, j, c):
+                    store.cells.setdefault(i, {})[j] = rows[i]._adopt(c)
+                    # A span may reach past the columns of the store
+                    rows[i]._ncols = None
+            for i, j, style, row_span, col_span in block['cells']:
+                c = TableCell(columns[j][i], row_span=row_span,
+                              col_span=col_span)
+                c._style = styles[style]
+                place(i, j, c)
+            for i, j in block['covered']:
+                place(i, j, _COVERED)
+        return table
+
+    @classmethod
+    def load(cls, path):
+        """Open a table saved with save(), memory-mapping the file so that
+        large columns are read from it as needed."""
+        import mmap
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_bytes(data)
+
+    def save(self, path):
+        "Write the table to a file in the format of to_bytes()."
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
     def cell(self, row, col):
         """Allows for direct addressing of individual cells (row, column)
 
         Any value not entered will remain unchanged.
-        Address is (row, column) with an origin index of 0."""
+        Address is (row, column) with an origin index of 0. A position
+        covered by a column span gives a SpanPlaceholder."""
         Row = self.rows[row]
         cell = Row.cells[col]
         return cell
@@ -306,30 +2546,1116 @@ class Table(object):
             r = TableRow(*r, max_len=max_len)
         r.set_parent(self)
         self.rows.append(r)
+        # The layout is extended to cover new rows when it is next needed
+
+    def extend_rows(self, rows):
+        """Append rows from any iterable, e.g. a generator or a DB cursor.
+
+        Rows that aren't TableRow objects are padded to the width of the
+        first row of the table, as in the constructor. Time taken is
+        proportional to the number of values loaded. If the table has a
+        memory_budget, it is checked before adding each row, against an
+        estimate kept up to date as rows are added."""
+        append = self.rows.append
+        max_len = self.rows[0].column_count() if self.rows else None
+        budget = self.memory_budget
+        if budget is not None:
+            used = self._usage_estimate()
+            seen, styles = set(), {}
+        for r in rows:
+            if not isinstance(r, TableRow):
+                r = TableRow.from_values(r, max_len)
+            if budget is not None:
+                used += (sum(_row_usage(r, True, seen, styles)) +
+                         _pointer_size)
+                if used > budget:
+                    self._budget_used = None
+                    self._over_budget(used, 'loading rows')
+                    budget = None
+            r.set_parent(self)
+            append(r)
+            if max_len is None:
+                max_len = r.column_count()
+        if budget is not None:
+            self._budget_used = (len(self.rows), used)
+
+    def _get_layout(self):
+        "Return the span layout for the table, computing it if needed."
+        layout = self._layout
+        rows = self.rows
+        nrows = len(rows)
+        # rows is a plain list, so rows inserted or removed through it are
+        # noticed by the first or last of the rows the layout was made for
+        # having moved. Checking just those keeps this cheap for a table
+        # growing a row at a time; clear_render_cache() is needed after
+        # replacing a row in the middle of the list.
+        last = layout.nrows - 1 if layout is not None else None
+        if (layout is None or last >= nrows or (last >= 0 and (
+                rows[0] is not layout.rows[0] or
+                rows[last] is not layout.rows[last]))):
+            layout = self._layout = _Layout(rows)
+            # Column indexes and style rule results refer to rows by position
+            self._indexes = {}
+            self._rule_cache = self._budget_used = None
+        elif layout.nrows < nrows:
+            # Rows appended since: carry on from the end of the layout, in
+            # place. Rows below layout.nrows are never changed, so threads
+            # rendering the table meanwhile are unaffected, and the lock
+            # stops two of them adding the same rows.
+            with _layout_lock:
+                if layout.nrows < nrows:
+                    layout._add(rows[layout.nrows:nrows])
+        return layout
     
-    def _repr_html_(self):
-        html = '<table>\n' 
-        above = []
+    def render_cache_info(self):
+        """Return a RenderCacheInfo(hits, misses, cached_rows) tuple.
+
+        hits and misses count rows rendered for display since the table was
+        created or clear_render_cache() was last called."""
+        cached = sum(1 for row in self.rows
+                     if row._html_cache is not None or
+                        row._html_compact_cache is not None or
+                        row._latex_cache is not None or
+                        row._text_cache is not None)
+        return RenderCacheInfo(self._cache_hits, self._cache_misses, cached)
+
+    def clear_render_cache(self):
+        """Forget the rendered output of all rows.
+
+        Changes made through cells are tracked automatically; this is needed
+        after modifying the value buffers of a table built from columns in
+        place, or replacing a row in the middle of rows."""
+        self._layout = None
+        self._drop_rendered()
+        self._cache_hits = self._cache_misses = 0
+
+    @property
+    def style_rules(self):
+        "The style rules added to the table, in order."
+        return tuple(self._style_rules)
+
+    def add_style_rule(self, rule):
+        """Colour cells in the HTML for the table by a StyleRule, such as
+        Highlight, ColourScale or StripeRows. Returns the rule.
+
+        Rules are worked out a column at a time when the table is rendered,
+        and nothing is stored in the cells. Later rules take precedence over
+        earlier ones, and colours set on cells over both. Rules shouldn't be
+        changed once added; remove one and add another instead."""
+        self._style_rules.append(rule)
+        self._rule_cache = None
+        return rule
+
+    def remove_style_rule(self, rule):
+        "Stop colouring cells by a rule added with add_style_rule()."
+        self._style_rules.remove(rule)
+        self._rule_cache = None
+
+    def clear_style_rules(self):
+        "Remove all style rules."
+        self._style_rules = []
+        self._rule_cache = None
+
+    def _rule_styles(self):
+        """The colours given by the style rules, as a _RuleStyles, or None
+        if there are no rules. It is kept until a rule or a cell changes, or
+        rows are added or moved."""
+        if not self._style_rules:
+            return None
+        self._get_layout()
+        cached = self._rule_cache
+        rows = self.rows
+        if cached is not None and cached.nrows == len(rows):
+            return cached
+        body = self._leading_headers()
+        if any(isinstance(row, TableHeaderRow) for row in rows[body:]):
+            body = dict((r, i) for i, r in enumerate(
+                [r for r, row in enumerate(rows)
+                 if not isinstance(row, TableHeaderRow)]))
+        colours = {} # {column: [bg_colours, text_colours]}
+        for rule in self._style_rules:
+            if rule.columns is None:
+                columns = range(self._column_count()) if rows else ()
+            else:
+                columns = [self._column_index(col) for col in rule.columns]
+            for col in columns:
+                if type(body) is dict:
+                    values = self._column_values(col)
+                    values = [values[r] for r in sorted(body)]
+                else:
+                    values = self._column_values(col, body)
+                current = colours.setdefault(col, [None, None])
+                for i, new in enumerate(rule.evaluate(values)):
+                    if new is None:
+                        continue
+                    old = current[i]
+                    current[i] = new if old is None else [
+                        b if b is not None else a for a, b in zip(old, new)]
+        styles = _RuleStyles(rows, body, colours)
+        self._rule_cache = styles
+        return styles
+
+    def profile(self, callback=None):
+        """Collect timings and counts for rendering the table in a with block.
+
+        Returns a RenderProfile, which covers all renders of the table and its
+        views in the block, except parallel ones. callback, if given, is
+        called with a RenderStats tuple as each render finishes. Without a
+        profile, rendering is not slowed down."""
+        return RenderProfile(self, callback)
+
+    def render_stats(self):
+        """Summarise rendering as a RenderStats tuple: cells, spans and bytes
+        rendered, row cache hits and misses, and seconds spent in each phase.
+
+        The totals are for the last profile() block; if there hasn't been
+        one, the HTML shown in the notebook is rendered to measure it."""
+        if self._last_profile is None:
+            with self.profile():
+                self._repr_html_()
+        return self._last_profile.stats()
+
+    def memory_usage(self, deep=True):
+        """Estimate the memory used by the table, as a MemoryUsage tuple of
+        sizes in bytes.
+
+        rows: the row objects, their lists of cells, and the column stores
+        of tables built from columns, apart from the columns themselves.
+        cells: TableCell objects.
+        placeholders: positions covered by column spans.
+        styles: the styles of the cells, each counted once, though styles
+        are shared with other tables.
+        values: the column buffers and, with deep, the values in cells and
+        columns, counting shared objects once.
+        layout: the cached span layout, column indexes and style rule
+        results.
+        rendered: the cached output of rows and formatted values.
+
+        Sizes come from sys.getsizeof(). Without deep, the values are not
+        counted, which is much quicker for tables of Python objects."""
+        getsizeof = sys.getsizeof
+        seen = set()
+        styles = {}
+        usage = [0, 0, 0, 0, 0]
+        stores = {}
         for row in self.rows:
-            row._above = above
-            html += row._repr_html_() + '\n'
-            above = row._current # Should this be passed back by the repr?
-        html += '</table>'
-        return html
-
-    def _repr_latex_(self):   
-        latex = '\\begin{tabular}{*{%d}{l}}\n'%self.rows[0].column_count()
-        # Top horizontal line of table
-        latex += r'\hline' + '\n' if self.has_header else ''
-        above = []
-        # Fill table contents
+            for i, n in enumerate(_row_usage(row, deep, seen, styles)):
+                usage[i] += n
+            store = getattr(row, '_store', None)
+            if store is not None:
+                stores[id(store)] = store
+        rows, cells, placeholders, values, rendered = usage
+        rows += getsizeof(self.rows)
+        for store in stores.values():
+            rows += getsizeof(store) + getsizeof(store.cells) + sum(
+                getsizeof(override) for override in store.cells.values())
+            values += sum(_column_sizeof(column, deep, seen)
+                          for column in store.columns)
+            rendered += _sizeof_deep(store.formatted, seen)
+        style_size = sum(getsizeof(style) +
+                         sum(_sizeof_deep(colour, seen) for colour in style)
+                         for style in styles.values())
+        layout = _sizeof_deep(self._indexes, seen)
+        if self._rule_cache is not None:
+            layout += self._rule_cache.sizeof(seen)
+        if self._layout is not None:
+            layout += _sizeof_deep(self._layout.entries, seen)
+            layout += getsizeof(self._layout.rows)
+            layout += _sizeof_deep(self._layout.incoming, seen)
+        return MemoryUsage(rows, cells, placeholders, style_size, values,
+                           layout, rendered,
+                           rows + cells + placeholders + style_size + values
+                           + layout + rendered)
+
+    def _over_budget(self, used, action):
+        "Raise MemoryBudgetError, or warn if memory_budget_warn is set."
+        message = ("Table would use about %d bytes after %s, over its "
+                   "memory_budget of %d" % (used, action, self.memory_budget))
+        if self.memory_budget_warn:
+            warnings.warn(message)
+        else:
+            raise MemoryBudgetError(message)
+
+    def _usage_estimate(self):
+        """The total of memory_usage(), reused from the last estimate while
+        rows have only been added with extend_rows(), so that loading rows a
+        few at a time takes time in proportion to the rows loaded. Rows
+        cached for display since then aren't counted until a cell changes or
+        the render cache is cleared."""
+        estimate = self._budget_used
+        if estimate is not None and estimate[0] == len(self.rows):
+            return estimate[1]
+        used = self.memory_usage().total
+        self._budget_used = (len(self.rows), used)
+        return used
+
+    def _budgeted(self, fragments):
+        """Pass on rendered fragments while the table and the text so far
+        fit in memory_budget."""
+        used = self._usage_estimate()
+        getsizeof = sys.getsizeof
+        checking = True
+        for fragment in fragments:
+            if checking:
+                used += getsizeof(fragment)
+                if used > self.memory_budget:
+                    self._over_budget(used, 'rendering')
+                    checking = False
+            yield fragment
+
+    def _drop_rendered(self):
         for row in self.rows:
-            row._above = above
-            latex += row._repr_latex_() + '\n'
-            above = row._current
-        #Bottom horizontal line of table
-        latex += r'\hline' + '\n' if self.has_header else ''
-        # Finish table
-        latex += r'\end{tabular}'
-        return latex
+            row._cells_changed()
+            store = getattr(row, '_store', None)
+            if store is not None:
+                store.formatted.clear()
+
+    def _caching(self):
+        "Whether rows being rendered now should use the row caches."
+        return self.cache_renders and getattr(_displaying, 'on', False)
+
+    def _iter_rows(self, fmt, prof=None):
+        """Render each row in the given format, with the RenderProfile
+        collecting timings, if any."""
+        entries = self._get_layout().entries
+        styles = self._rule_styles() if fmt in _styled_formats else None
+        if styles is not None:
+            rows = zip(self.rows, entries, map(styles.__getitem__,
+                                               range(len(self.rows))))
+            if prof is not None:
+                for row, row_entries, row_styles in rows:
+                    yield prof._row(row, row_entries, fmt, self, row_styles)
+            elif self._caching():
+                for row, row_entries, row_styles in rows:
+                    yield row._render_cached(fmt, row_entries, self, None,
+                                             row_styles)
+            else:
+                for row, row_entries, row_styles in rows:
+                    yield row._render(fmt, row_entries, None, row_styles)
+        elif prof is not None:
+            for row, row_entries in zip(self.rows, entries):
+                yield prof._row(row, row_entries, fmt, self)
+        elif self._caching():
+            for row, row_entries in zip(self.rows, entries):
+                yield row._render_cached(fmt, row_entries, self)
+        else:
+            render = '_' + fmt
+            for row, row_entries in zip(self.rows, entries):
+                yield getattr(row, render)(row_entries)
+
+
+    def _column_count(self):
+        return self.rows[0].column_count() if self.rows else 0
+
+    def _render_chunk(self, fmt, start, stop):
+        "Render rows start:stop, each followed by a newline."
+        entries = self._get_layout().entries
+        rows = self.rows
+        styles = self._rule_styles() if fmt in _styled_formats else None
+        if styles is not None:
+            return ''.join([rows[r]._render(fmt, entries[r], None, styles[r])
+                            + '\n' for r in range(start, stop)])
+        render = '_' + fmt
+        return ''.join([getattr(rows[r], render)(entries[r]) + '\n'
+                        for r in range(start, stop)])
+
+    def _store_runs(self):
+        """Split the rows into (start, stop, store) runs: rows start:stop
+        are consecutive rows of store, untouched by spans, or store is None
+        for a single row of any other kind. Kept with the layout."""
+        layout = self._get_layout()
+        runs = layout.store_runs
+        if runs is not None:
+            return runs
+        runs = []
+        entries = layout.entries
+        run_store = next_index = None
+        for r, row in enumerate(self.rows):
+            store = getattr(row, '_store', None)
+            if store is not None and entries[r] is None:
+                if store is run_store and row._index == next_index:
+                    runs[-1] = (runs[-1][0], r + 1, store)
+                else:
+                    run_store = store
+                    runs.append((r, r + 1, store))
+                next_index = row._index + 1
+                continue
+            run_store = None
+            runs.append((r, r + 1, None))
+        layout.store_runs = runs
+        return runs
+
+    def _column_values(self, col, start=0):
+        """The values in a column from row start on, as a list. Positions
+        covered by a span take the value of the spanning cell, and rows too
+        short to reach the column give None. Deferred values are worked
+        out. Rows backed by columns are read from the column a run at a
+        time."""
+        layout = self._get_layout()
+        rows = self.rows
+        values = []
+        append = values.append
+        for run_start, run_stop, store in self._store_runs():
+            if run_stop <= start:
+                continue
+            run_start = max(run_start, start)
+            if store is not None:
+                if col < len(store.columns):
+                    index = rows[run_start]._index
+                    values.extend(store.column_values(
+                        col, index, index + run_stop - run_start))
+                else:
+                    values.extend([None] * (run_stop - run_start))
+                continue
+            r = run_start
+            entries = layout.entries[r]
+            if entries is None:
+                append(_resolved(rows[r]._value_at(col)))
+            else:
+                row_values = _row_values(rows[r], entries, layout, r)
+                append(row_values[col] if col < len(row_values) else None)
+        return values
+
+    def _blocks(self):
+        return _span_blocks(self._get_layout(), self._leading_headers(),
+                            len(self.rows))
+
+    def _view_of(self, blocks):
+        """Return a TableView of the header rows at the start of the table,
+        followed by the given (start, stop) row ranges."""
+        nhead = self._leading_headers()
+        segments = [(0, nhead)] if nhead else []
+        for start, stop in blocks:
+            if segments and segments[-1][1] == start:
+                segments[-1] = (segments[-1][0], stop)
+            else:
+                segments.append((start, stop))
+        return TableView(self, segments)
+
+    def take(self, indices):
+        """Return a TableView of the rows at the given positions, in order.
+
+        Header rows at the start of the table stay at the top, and are
+        skipped in indices. Spans are cut to fit, as in page()."""
+        nhead = self._leading_headers()
+        positions = range(len(self.rows))
+        blocks = []
+        for i in indices:
+            r = positions[i]
+            if r >= nhead:
+                blocks.append((r, r + 1))
+        return self._view_of(blocks)
+
+    def index(self, col):
+        """Return a dict mapping each value in a column to a list of the
+        positions of the rows holding it.
+
+        Header rows at the start of the table are left out. The index is
+        kept for later calls, extended to cover appended rows, and dropped
+        when a cell in the table changes or rows are inserted, replaced or
+        removed."""
+        col = self._column_index(col)
+        nrows = len(self.rows)
+        self._get_layout()
+        cached = self._indexes.get(col)
+        if cached is None or cached[0] > nrows:
+            start, index = self._leading_headers(), {}
+        else:
+            start, index = cached
+        if start < nrows:
+            for r, value in enumerate(self._column_values(col, start), start):
+                index.setdefault(value, []).append(r)
+        self._indexes[col] = (nrows, index)
+        return index
+
+    def lookup(self, col, value):
+        """Return a TableView of the rows with value in a column, found with
+        index(). Rows tied by row spans to a matching row are included, as
+        in filter()."""
+        layout = self._get_layout()
+        incoming = layout.incoming
+        nhead = self._leading_headers()
+        nrows = len(self.rows)
+        blocks = []
+        for r in self.index(col).get(value, ()):
+            if blocks and blocks[-1][1] > r:
+                continue # In the block of an earlier match
+            start, stop = r, r + 1
+            while start > nhead and start in incoming:
+                start -= 1
+            while stop < nrows and stop in incoming:
+                stop += 1
+            blocks.append((start, stop))
+        return self._view_of(blocks)
+
+    @staticmethod
+    def vstack(*tables):
+        """Show tables, views or stacks one above the other, as a VStack.
+
+        Rows are referred to rather than copied, and keep their spans.
+        Header rows at the start of a table which repeat the first table's
+        are left out, and narrower tables are padded with blank cells."""
+        return VStack(tables)
+
+    @staticmethod
+    def hstack(*tables):
+        """Show tables, views or stacks side by side, as an HStack.
+
+        Rows are referred to rather than copied, and keep their spans. The
+        header rows at the start of the tables are lined up, and shorter
+        tables are padded with blank rows."""
+        return HStack(tables)
+
+    def page(self, n, size):
+        """Return a TableView of page n (counting from 0) of size rows.
+
+        Header rows at the start of the table are repeated at the top of
+        every page. Rows are not copied, and spans crossing the page edges
+        are cut to fit."""
+        if size < 1:
+            raise ValueError("Page size must be at least 1")
+        nhead = self._leading_headers()
+        start = nhead + n * size
+        if n < 0 or (n > 0 and start >= len(self.rows)):
+            raise IndexError("Page %d is out of range" % n)
+        segments = [(0, nhead)] if nhead else []
+        segments.append((start, min(start + size, len(self.rows))))
+        return TableView(self, segments)
+
+    def _latex_chunks(self, chunk_rows):
+        """Split the table into TableViews of about chunk_rows rows after the
+        leading header rows, which are repeated in each. Chunks only end
+        where no row span continues below, so they may be longer."""
+        if chunk_rows < 1:
+            raise ValueError("Chunk size must be at least 1")
+        nhead = self._leading_headers()
+        nrows = len(self.rows)
+        head = [(0, nhead)] if nhead else []
+        if nhead == nrows:
+            yield TableView(self, head)
+            return
+        incoming = self._get_layout().incoming
+        start = nhead
+        while start < nrows:
+            stop = min(start + chunk_rows, nrows)
+            while stop < nrows and stop in incoming:
+                stop += 1
+            yield TableView(self, head + [(start, stop)])
+            start = stop
+
+    def iter_latex_chunks(self, chunk_rows):
+        """Generate the table as a series of LaTeX tabulars of about
+        chunk_rows rows each, in fragments.
+
+        TeX can run out of memory for a single tabular of a few thousand
+        rows. Header rows at the start of the table are repeated in every
+        tabular, and a chunk is made longer rather than splitting a row
+        span."""
+        packages = set()
+        for i, view in enumerate(self._latex_chunks(chunk_rows)):
+            if i:
+                yield '\n'
+            yield view._head('latex')
+            for latex in view._iter_latex_rows(packages):
+                yield latex
+            yield view._foot('latex') + '\n'
+        _warn_latex_packages(packages)
+
+    def _display_view(self):
+        """Return a TableView applying the max_rows and max_cols limits, or
+        None if the table fits."""
+        nrows = len(self.rows)
+        ncols = self._column_count() if nrows else 0
+        segments = columns = None
+        if self.max_rows is not None and nrows > self.max_rows:
+            head = max(self.max_rows // 2, 1)
+            tail = max(self.max_rows - head, 1)
+            segments = [(0, head), None, (nrows - tail, nrows)]
+        if self.max_cols is not None and ncols > self.max_cols:
+            head = max(self.max_cols // 2, 1)
+            tail = max(self.max_cols - head, 1)
+            columns = [(0, head), (ncols - tail, ncols)]
+        if segments is None and columns is None:
+            return None
+        return TableView(self, segments or [(0, nrows)], columns)
+
+    @_display
+    def _repr_html_(self):
+        view = self._display_view()
+        if view is not None:
+            return view._repr_html_()
+        if self.compact_html:
+            return self._joined(self.iter_html_compact())
+        return self._joined(self.iter_html())
+
+    @_display
+    def _repr_pretty_(self, p, cycle):
+        view = self._display_view()
+        if view is not None:
+            return view._repr_pretty_(p, cycle)
+        super(Table, self)._repr_pretty_(p, cycle)
+
+    @_display
+    def _repr_latex_(self):
+        chunk_rows = self.latex_chunk_rows
+        if chunk_rows is not None and len(self.rows) > chunk_rows:
+            return self._joined(self.iter_latex_chunks(chunk_rows))
+        return self._joined(self.iter_latex())
+
+def _clip_rows(entries, layout, r, start, stop):
+    """Fit a row's layout entries into the rows start:stop of a table.
+
+    Row spans running past stop are shortened. In the first row, cells
+    covered by a row span from above the window are replaced by that span's
+    origin cell, with its row span cut to what is left of it."""
+    out = []
+    for entry in entries:
+        col, rs, cs, cell = entry
+        if rs == 0:
+            if r == start:
+                for o_row, o_col, o_rs, o_cs, o_cell in layout.incoming[r]:
+                    if o_col == col:
+                        entry = (col, min(o_row + o_rs, stop) - r, cs, o_cell)
+                        break
+        elif r + rs > stop:
+            entry = (col, stop - r, cs, cell)
+        out.append(entry)
+    return out
+
+def _clip_columns(entries, columns):
+    """Keep the parts of a row's layout entries in the given column ranges.
+
+    columns is a list of (start, stop) ranges; a '...' cell is put between
+    them. Column spans are cut at the range edges."""
+    out = []
+    for i, (start, stop) in enumerate(columns):
+        if i:
+            out.append((None, 1, 1, '...'))
+        for col, rs, cs, cell in entries:
+            end = col + cs
+            if end <= start or col >= stop:
+                continue
+            new_col = max(col, start)
+            out.append((new_col, rs, min(end, stop) - new_col, cell))
+    return out
+
+class TableView(_TableBase):
+    """A read-only view of some rows and columns of a Table.
+
+    The view refers to the table's rows rather than copying them, and is
+    rendered like a table. segments is a list of (start, stop) row ranges,
+    with None for a row of '...' cells; columns is None for all columns, or a
+    list of (start, stop) ranges with a '...' column between them.
+    """
+    def __init__(self, table, segments, columns=None):
+        self.table = table
+        self.segments = segments
+        self.columns = columns
+
+    @property
+    def has_header(self):
+        return self.table.has_header
+
+    @property
+    def rows(self):
+        "The table rows in the view."
+        rows = self.table.rows
+        return [rows[r] for seg in self.segments if seg is not None
+                for r in range(*seg)]
+
+    def _column_count(self):
+        if self.columns is None:
+            return self.table._column_count()
+        return (sum(stop - start for start, stop in self.columns)
+                + len(self.columns) - 1)
+
+    def _styled_cells(self):
+        # Also the cells of row spans starting above each segment
+        layout = self.table._get_layout()
+        for seg in self.segments:
+            if seg is not None and seg[0] < seg[1]:
+                for origin in layout.incoming.get(seg[0], ()):
+                    c = origin[4]
+                    if isinstance(c, TableCell) and (c._style[1] or
+                                                     c._style[2]):
+                        yield c
+        for c in super(TableView, self)._styled_cells():
+            yield c
+
+    @property
+    def _profiler(self):
+        return self.table._profiler
+
+    def _blocks(self):
+        # Each segment starts a block, with spans from above it cut off
+        table = self.table
+        layout = table._get_layout()
+        nhead = table._leading_headers()
+        blocks = []
+        for seg in self.segments:
+            if seg is not None and max(seg[0], nhead) < seg[1]:
+                blocks.extend(_span_blocks(layout, max(seg[0], nhead),
+                                           seg[1]))
+        return blocks
+
+    def _iter_rows(self, fmt, prof=None):
+        table = self.table
+        layout = table._get_layout()
+        rows = table.rows
+        columns = self.columns
+        render = '_' + fmt
+        styles = table._rule_styles() if fmt in _styled_formats else None
+        row_styles = None
+        caching = table._caching()
+        for seg in self.segments:
+            if seg is None:
+                filler = TableRow.from_values(['...'] * self._column_count())
+                if prof is not None:
+                    yield prof._row(filler, None, fmt, None)
+                else:
+                    yield getattr(filler, render)(None)
+                continue
+            start, stop = seg
+            for r in range(start, stop):
+                row = rows[r]
+                entries = layout.entries[r]
+                # The first row shows the origins of spans from rows above,
+                # which the row's cache wouldn't know had changed
+                cache = caching and not (r == start and r in layout.incoming)
+                if entries is not None:
+                    entries = _clip_rows(entries, layout, r, start, stop)
+                if columns is not None:
+                    if entries is None:
+                        entries = [(c, 1, 1, v)
+                                   for c, v in enumerate(row._slots)]
+                    entries = _clip_columns(entries, columns)
+                if styles is not None:
+                    row_styles = styles[r]
+                if prof is not None:
+                    yield prof._row(row, entries, fmt, table if cache else
+                                    None, row_styles)
+                elif cache:
+                    yield row._render_cached(fmt, entries, table, None,
+                                             row_styles)
+                else:
+                    yield row._render(fmt, entries, None, row_styles)
+
+    @_display
+    def _repr_html_(self):
+        if self.table.compact_html:
+            return self._joined(self.iter_html_compact())
+        return self._joined(self.iter_html())
+
+# Row endings of LaTeX rows; header rows add \hline after the usual one
+_LATEX_ROW_END = '\\\\'
+_LATEX_HEADER_END = _LATEX_ROW_END + '\\\nhline'
+_blank_html_cells = {'html': '<td  ></td>', 'html_compact': '<td></td>'}
+
+def _split_row(fmt, text):
+    """Split a row rendered in fmt into the markup for its cells and what
+    ends the row."""
+    if fmt == 'text':
+        return text, None
+    if fmt == 'latex':
+        end = (_LATEX_HEADER_END if text.endswith(_LATEX_HEADER_END)
+               else _LATEX_ROW_END)
+        return text[:-len(end)], end
+    return text[4:-5], '</tr>'
+
+def _blank_cells(fmt, n):
+    "The markup for n blank cells in fmt, for _join_cells()."
+    if fmt == 'text':
+        return ((1, ''),) * n
+    if fmt == 'latex':
+        return ' & ' * (n - 1)
+    return _blank_html_cells[fmt] * n
+
+def _join_cells(fmt, pieces, end):
+    """Make a row in fmt from the markup for groups of cells, from
+    _split_row() or _blank_cells(), and the row ending."""
+    if fmt == 'text':
+        return tuple(chain(*pieces))
+    if fmt == 'latex':
+        return ' & '.join(pieces) + end
+    return '<tr>' + ''.join(pieces) + end
+
+class _Stack(_TableBase):
+    """Rendering shared by VStack and HStack, which combine the rendered rows
+    of the tables in them, in parts."""
+    _profiler = None # The tables in the stack are profiled separately
+    memory_budget = None # Only checked for rendering tables themselves
+
+    def _styled_cells(self):
+        for part in self.parts:
+            for c in part._styled_cells():
+                yield c
+
+    def _rule_style_set(self):
+        # The styles from the rules of all the tables, for compact HTML
+        styles = []
+        for part in self.parts:
+            styles.extend(part._rule_style_set())
+        return styles
+
+    def _blocks(self):
+        raise TypeError("Stacked tables can't be sorted or filtered; sort "
+                        "or filter the tables before stacking them")
 
+    def sort_by(self, col, key=None, reverse=False):
+        self._blocks()
+
+    def filter(self, predicate):
+        self._blocks()
+
+    @_display
+    def _repr_html_(self):
+        return ''.join(self.iter_html())
+
+def _header_values(part):
+    """The values in the header rows at the start of a table, without the
+    blanks padding them."""
+    values = []
+    for row in part.rows[:part._leading_headers()]:
+        row_values = [c._value if isinstance(c, TableCell) else c
+                      for c in row._slots]
+        while row_values and row_values[-1] == '':
+            row_values.pop()
+        values.append(row_values)
+    return values
+
+class VStack(_Stack):
+    """Tables shown one above the other, from Table.vstack().
+
+    The rows of the tables are rendered as they are, without being copied.
+    Header rows at the start of a table which repeat those of the first
+    table are left out, and narrower tables are padded with blank cells to
+    the width of the widest, as rows are padded to the width of a table.
+    parts holds the tables, which may be views or other stacks.
+    """
+    def __init__(self, parts):
+        if not parts:
+            raise ValueError("Nothing to stack")
+        self.parts = list(parts)
+        first = _header_values(self.parts[0])
+        # Leading rows left out of each part
+        self._skip = [0] + [len(first) if first and
+                            _header_values(part) == first else 0
+                            for part in self.parts[1:]]
+
+    @property
+    def has_header(self):
+        return any(part.has_header for part in self.parts)
+
+    @property
+    def rows(self):
+        "The table rows in the stack."
+        return [row for part, skip in zip(self.parts, self._skip)
+                for row in part.rows[skip:]]
+
+    def _column_count(self):
+        return max(part._column_count() if part.rows else 0
+                   for part in self.parts)
+
+    def _iter_rows(self, fmt, prof=None):
+        width = self._column_count()
+        for part, skip in zip(self.parts, self._skip):
+            pad = width - part._column_count() if part.rows else 0
+            for i, text in enumerate(part._rows(fmt)):
+                if i < skip:
+                    continue
+                if pad:
+                    cells, end = _split_row(fmt, text)
+                    text = _join_cells(fmt, [cells, _blank_cells(fmt, pad)],
+                                       end)
+                yield text
+
+class HStack(_Stack):
+    """Tables shown side by side, from Table.hstack().
+
+    Row n of the stack is made of row n of each table, rendered as it is,
+    without being copied. The header rows at the start of each table are
+    lined up, with blank rows below the headers of tables with fewer of
+    them, and shorter tables are padded with blank rows at the bottom.
+    parts holds the tables, which may be views or other stacks.
+    """
+    def __init__(self, parts):
+        if not parts:
+            raise ValueError("Nothing to stack")
+        self.parts = list(parts)
+
+    @property
+    def has_header(self):
+        return any(part.has_header for part in self.parts)
+
+    @property
+    def rows(self):
+        "The table rows in the stack, table by table."
+        return [row for part in self.parts for row in part.rows]
+
+    def _leading_headers(self):
+        return max(part._leading_headers() for part in self.parts)
+
+    def _column_count(self):
+        return sum(part._column_count() if part.rows else 0
+                   for part in self.parts)
+
+    def _iter_rows(self, fmt, prof=None):
+        parts = [(part._rows(fmt), part._leading_headers(),
+                  part._column_count() if part.rows else 0)
+                 for part in self.parts]
+        def row(texts):
+            pieces = []
+            end = None
+            for text, (rows, nhead, width) in zip(texts, parts):
+                if not width:
+                    continue
+                if text is None:
+                    pieces.append(_blank_cells(fmt, width))
+                    continue
+                cells, row_end = _split_row(fmt, text)
+                pieces.append(cells)
+                if end is None or row_end == _LATEX_HEADER_END:
+                    end = row_end
+            if end is None:
+                end = _LATEX_ROW_END if fmt == 'latex' else '</tr>'
+            return _join_cells(fmt, pieces, end)
+        for i in range(self._leading_headers()):
+            yield row([next(rows) if i < nhead else None
+                       for rows, nhead, width in parts])
+        while True:
+            texts = [next(rows, None) for rows, nhead, width in parts]
+            if all(text is None for text in texts):
+                break
+            yield row(texts)
+
+class RenderProfile(object):
+    """Timings and counts for rendering a table, from Table.profile().
+
+    Time is split into phases: layout (working out the spans), format
+    (formatters from set_format()), escape (LaTeX escaping) and assemble
+    (building the markup for the rows, or reusing cached rows). row_counts
+    has a (cells, spans, bytes) tuple for each row of the latest render.
+    """
+    _PHASES = ('layout', 'format', 'escape', 'assemble')
+
+    def __init__(self, table, callback=None):
+        self.table = table
+        self.callback = callback
+        self.renders = self.rows = self.cells = self.spans = self.bytes = 0
+        self.cache_hits = self.cache_misses = 0
+        self.times = dict.fromkeys(self._PHASES, 0.0)
+        self.row_counts = []
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = self.table._profiler
+        self.table._profiler = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self.table._profiler = self._previous
+        self.table._last_profile = self
+
+    def stats(self):
+        "The totals so far, as a RenderStats tuple."
+        times = self.times
+        return RenderStats(self.renders, self.rows, self.cells, self.spans,
+                           self.bytes, self.cache_hits, self.cache_misses,
+                           *[times[phase] for phase in self._PHASES])
+
+    def report(self):
+        "A readable summary of the totals."
+        stats = self.stats()
+        total = sum(self.times.values()) or 1
+        lines = ['%d renders: %d rows, %d cells, %d spans, %d bytes' %
+                 stats[:5],
+                 'row cache: %d hits, %d misses' % stats[5:7]]
+        for phase in self._PHASES:
+            seconds = self.times[phase]
+            lines.append('%-9s %10.3f ms %5.1f%%' % (phase, seconds * 1e3,
+                                                     100 * seconds / total))
+        return '\n'.join(lines)
+
+    def _timed(self, phase, func, arg):
+        "Call func(arg), adding the time taken to phase."
+        start = _clock()
+        try:
+            return func(arg)
+        finally:
+            self.times[phase] += _clock() - start
+
+    def _render(self, table, fmt):
+        "Render the rows of table (or a view) in fmt, collecting timings."
+        source = getattr(table, 'table', table)
+        before = self.stats()
+        hits, misses = source._cache_hits, source._cache_misses
+        self.row_counts = []
+        self._timed('layout', type(source)._get_layout, source)
+        for text in table._iter_rows(fmt, self):
+            yield text
+        self.renders += 1
+        self.cache_hits += source._cache_hits - hits
+        self.cache_misses += source._cache_misses - misses
+        if self.callback is not None:
+            self.callback(RenderStats(*[now - then for now, then in
+                                        zip(self.stats(), before)]))
+
+    def _row(self, row, entries, fmt, table, styles=None):
+        """Render a row for _iter_rows(), caching it in table if it caches
+        renders, and count what it holds."""
+        times = self.times
+        inner = times['format'] + times['escape']
+        start = _clock()
+        if table is not None and table._caching():
+            text = row._render_cached(fmt, entries, table, self, styles)
+        else:
+            text = row._render(fmt, entries, self, styles)
+        times['assemble'] += (_clock() - start -
+                              (times['format'] + times['escape'] - inner))
+        if entries is None:
+            cells, spans = len(row._slots), 0
+        else:
+            cells = spans = 0
+            for col, rs, cs, c in entries:
+                if rs:
+                    cells += 1
+                    if rs > 1 or cs > 1:
+                        spans += 1
+        self.rows += 1
+        self.cells += cells
+        self.spans += spans
+        if isinstance(text, tuple): # From TableRow._text()
+            size = sum(len(t) for cs, t in text)
+        else:
+            size = len(text)
+        self.bytes += size
+        self.row_counts.append((cells, spans, size))
+        return text
+
+class DisplayPublisher(object):
+    """Sends HTML to the notebook through IPython display handles.
+
+    This is what LiveTable uses by default. Anything with the same display()
+    and update() methods can be used instead, e.g. a RecordingPublisher."""
+    def display(self, html):
+        "Show html as a new output, and return a handle for updating it."
+        from IPython.display import DisplayHandle, HTML
+        handle = DisplayHandle()
+        handle.display(HTML(html))
+        return handle
+
+    def update(self, handle, html):
+        "Replace the output shown through handle with html."
+        from IPython.display import HTML
+        handle.update(HTML(html))
+
+class RecordingPublisher(object):
+    """A stand-in for DisplayPublisher which keeps what would be shown.
+
+    outputs holds the current HTML of each output, by handle, and messages
+    lists every (handle, html) sent, for checking what a LiveTable does
+    without a notebook."""
+    def __init__(self):
+        self.outputs = []
+        self.messages = []
+
+    def display(self, html):
+        handle = len(self.outputs)
+        self.outputs.append(html)
+        self.messages.append((handle, html))
+        return handle
+
+    def update(self, handle, html):
+        self.outputs[handle] = html
+        self.messages.append((handle, html))
+
+    @property
+    def bytes_sent(self):
+        "The total size of the HTML sent, in characters."
+        return sum(len(html) for handle, html in self.messages)
+
+class LiveTable(object):
+    """A table shown in the notebook while rows are still being added.
+
+    Rows added with append_row() or extend_rows() go into table, and the
+    output is updated at most once every min_interval seconds. A display
+    handle can only replace its output as a whole, so rather than the whole
+    table, the output shows the leading header rows and the last window rows
+    (by default, the table's max_rows). Neither the time taken by an update
+    nor its size grows with the table.
+
+    Call flush() or close(), or use the LiveTable in a with block, to show
+    rows added since the last update; the full table (subject to the usual
+    display limits) is shown on close().
+    """
+    def __init__(self, table=None, min_interval=0.5, window=None,
+                 publisher=None, clock=None):
+        self.table = Table() if table is None else table
+        self.min_interval = min_interval
+        self.window = self.table.max_rows if window is None else window
+        self.publisher = DisplayPublisher() if publisher is None else publisher
+        if clock is None:
+            clock = getattr(time, 'monotonic', time.time)
+        self._clock = clock
+        self._handle = None
+        self._last_flush = None
+        self.rows_sent = 0 # Rows in the table when the output was updated
+
+    def append_row(self, r, max_len=None):
+        "Add a row to the table, as Table.append_row(), and maybe update."
+        self.table.append_row(r, max_len=max_len)
+        self._maybe_flush()
+
+    def extend_rows(self, rows):
+        "Add rows to the table, as Table.extend_rows(), and maybe update."
+        self.table.extend_rows(rows)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        last = self._last_flush
+        if last is None or self._clock() - last >= self.min_interval:
+            self.flush()
+
+    def _window_view(self):
+        "A TableView of the leading header rows and the last window rows."
+        table = self.table
+        nrows = len(table.rows)
+        nhead = table._leading_headers()
+        start = nhead if self.window is None else max(nhead,
+                                                      nrows - self.window)
+        segments = [(0, nhead)] if nhead else []
+        if start > nhead:
+            segments.append(None)
+        segments.append((start, nrows))
+        full = table._display_view()
+        return TableView(table, segments, full.columns if full else None)
+
+    def _publish(self, html):
+        if self._handle is None:
+            self._handle = self.publisher.display(html)
+        else:
+            self.publisher.update(self._handle, html)
+        self._last_flush = self._clock()
+        self.rows_sent = len(self.table.rows)
+
+    def flush(self):
+        "Update the output now, if rows have been added since the last update."
+        if self._handle is None or len(self.table.rows) != self.rows_sent:
+            # Rendered like an export, so the window rows aren't left in
+            # the row caches as it moves down the table
+            view = self._window_view()
+            fmt = 'html_compact' if self.table.compact_html else 'html'
+            self._publish(view._joined(view._iter_format(fmt)))
+
+    def close(self):
+        "Show the finished table in the output."
+        self._publish(self.table._repr_html_())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _repr_html_(self):
+        return self.table._repr_html_()
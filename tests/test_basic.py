@@ -98,7 +98,7 @@ def test_col_span_latex():
     assert len(lines)==4
     col_split = re.compile('&')
     parts = col_split.split(lines[0])
-    cl_check = re.compile('\w*\\multicolumn\s*\{\s*2\s*}')
+    cl_check = re.compile(r'\w*\\multicolumn\s*\{\s*2\s*}')
     assert len(cl_check.findall(parts[0]))>0
     
 def _actual_col_span_latex(t):
@@ -109,7 +109,7 @@ def _actual_col_span_latex(t):
     assert len(lines)==4
     col_split = re.compile('&')
     parts = col_split.split(lines[0])
-    cl_check = re.compile('\w*\\multicolumn\s*\{\s*2\s*}')
+    cl_check = re.compile(r'\w*\\multicolumn\s*\{\s*2\s*}')
     assert len(cl_check.findall(parts[0]))>0
     #print("pass")
     
@@ -140,5 +140,5 @@ def test_cell_method_col_span_latex():
     assert len(lines)==4
     col_split = re.compile('&')
     parts = col_split.split(lines[0])
-    cl_check = re.compile('\w*\\multicolumn\s*\{\s*2\s*}')
+    cl_check = re.compile(r'\w*\\multicolumn\s*\{\s*2\s*}')
     assert len(cl_check.findall(parts[0]))>0
@@ -0,0 +1,34 @@
+import json
+import warnings
+from benchmarks import benchmarks, run
+
+def test_benchmark_tables():
+    t = benchmarks.make_table(100, 'spans', 'header')
+    assert len(t.rows) == 10
+    assert t.cell(4, 0).row_span == 2
+
+def test_run_and_save(tmpdir):
+    out = str(tmpdir.join('results.json'))
+    status = run.main(['--max-cells', '100', '--repeat', '1',
+                       '--filter', "(100, 'dense', 'body')", '--save', out])
+    assert status == 0
+    with open(out) as f:
+        results = json.load(f)['results']
+    assert results
+    for name, result in results.items():
+        assert ('time' in result) != ('peak_memory' in result)
+
+def test_compare():
+    baseline = {'a': {'time': 1.0}, 'b': {'peak_memory': 100}}
+    assert run.compare({'a': {'time': 1.1}, 'b': {'peak_memory': 100}},
+                       baseline, 0.2) == []
+    assert run.compare({'a': {'time': 1.5}, 'c': {'time': 9.0}},
+                       baseline, 0.2) == ['a']
+
+def test_warning_filters_restored():
+    before = warnings.filters[:]
+    bench = benchmarks.RenderCached()
+    bench.setup(100, 'spans')
+    assert warnings.filters[0][0] == 'ignore'
+    bench.teardown(100, 'spans')
+    assert warnings.filters == before
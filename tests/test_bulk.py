@@ -0,0 +1,36 @@
+import random
+from tabipy import Table, TableRow, TableCell, TableHeaderRow
+
+def full_count(row):
+    return row.column_count(debug=True)
+
+def test_running_column_count(capsys):
+    rng = random.Random(42)
+    for trial in range(50):
+        max_len = rng.choice([None, 3, 6])
+        values = [TableCell(i, col_span=rng.randint(1, 3))
+                  if rng.random() < 0.3 else i for i in range(rng.randint(0, 6))]
+        row = TableRow(*values, max_len=max_len)
+        count = row.column_count()
+        assert count == full_count(row)
+        if row.cells:
+            row.cells[0].col_span = 2
+        assert row.column_count() == full_count(row)
+
+def test_from_values():
+    row = TableRow.from_values(iter([1, 2]), max_len=4)
+    assert row._slots == [1, 2, '', '']
+    assert row.column_count() == 4
+    spanned = TableRow.from_values([TableCell(1, col_span=2), 3])
+    assert spanned.column_count() == 3
+    assert isinstance(TableHeaderRow.from_values(['a']), TableHeaderRow)
+
+def test_extend_rows_generator():
+    t = Table(TableHeaderRow('a', 'b', 'c'))
+    t.extend_rows((i, i * 2) for i in range(1000))
+    assert len(t.rows) == 1001
+    assert t.rows[-1]._slots == [999, 1998, '']
+    assert t.rows[-1].parent is t
+    expected = Table(TableHeaderRow('a', 'b', 'c'), (0, 0), (1, 2))
+    t.rows[3:] = []
+    assert t._repr_html_() == expected._repr_html_()
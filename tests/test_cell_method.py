@@ -12,10 +12,9 @@ def t():
     cell.col_span = 2
     return t
     
-def test_cell_method_col_span_html():
+def test_cell_method_col_span_html(t):
     "This tests that col_span works in html"
-    #t = t()
-    t1_html = t()._repr_html_()
+    t1_html = t._repr_html_()
     row_split = re.compile('<\s*tr\s*>')
     lines = row_split.split(t1_html)
     assert len(lines)==4
@@ -24,14 +23,13 @@ def test_cell_method_col_span_html():
     cl_check = re.compile('colspan\s*=\s*"\s*2\s*"')
     assert len(cl_check.findall(parts[0]))>0
     
-def test_cell_method_col_span_html():
+def test_cell_method_col_span_latex(t):
     "This tests that col_span works in latex"
-    #t = t()
-    t1_latex = t()._repr_latex_()
+    t1_latex = t._repr_latex_()
     row_split = re.compile(r'\\\\')
     lines = row_split.split(t1_latex)
     assert len(lines)==4
     col_split = re.compile('&')
     parts = col_split.split(lines[0])
-    cl_check = re.compile('\w*\\multicolumn\s*\{\s*2\s*}')
+    cl_check = re.compile(r'\w*\\multicolumn\s*\{\s*2\s*}')
     assert len(cl_check.findall(parts[0]))>0
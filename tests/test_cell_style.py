@@ -0,0 +1,28 @@
+import sys
+from tabipy import Table, TableCell, TableHeader
+
+def test_cell_memory_budget():
+    for cell in (TableCell(1), TableHeader('a'),
+                 TableCell('x', bg_colour='red', row_span=2)):
+        assert not hasattr(cell, '__dict__')
+        assert sys.getsizeof(cell) <= TableCell._MEMORY_BUDGET
+
+def test_shared_styles():
+    a = TableCell(1, bg_colour='red', text_colour='white')
+    b = TableCell(2, bg_colour='red', text_colour='white')
+    assert a._style is b._style
+    assert TableCell(3)._style is TableCell(4)._style
+    assert TableHeader(5)._style is TableCell(6, header=True)._style
+
+def test_style_setters():
+    t = Table((1,2),(3,4))
+    cell = t.cell(0,0)
+    other = t.cell(0,1)
+    cell.bg_colour = 'yellow'
+    assert cell.bg_colour == 'yellow'
+    assert cell.text_colour is None
+    assert other.bg_colour is None
+    cell.header = True
+    assert cell.header and cell.bg_colour == 'yellow'
+    assert t._repr_html_().count('<th') == 1
+    assert 'background-color:yellow' in t._repr_html_()
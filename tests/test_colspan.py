@@ -32,6 +32,6 @@ def test_col_span_latex(t):
     assert len(lines)==4
     col_split = re.compile('&')
     parts = col_split.split(lines[0])
-    cl_check = re.compile('\w*\\multicolumn\s*\{\s*2\s*}')
+    cl_check = re.compile(r'\w*\\multicolumn\s*\{\s*2\s*}')
     assert len(cl_check.findall(parts[0]))>0
     #print("pass")
@@ -0,0 +1,76 @@
+from array import array
+import pytest
+from tabipy import Table, TableCell, TableHeaderRow
+
+def test_from_columns_matches_rows():
+    cols = [[1, 4, 7], array('d', [2.5, 5.5, 8.5]), ('a', 'b', 'c')]
+    t = Table.from_columns(cols, header=['x', 'y', 'z'])
+    expected = Table(TableHeaderRow('x', 'y', 'z'),
+                     (1, 2.5, 'a'),
+                     (4, 5.5, 'b'),
+                     (7, 8.5, 'c'))
+    assert t._repr_html_() == expected._repr_html_()
+    assert t._repr_latex_() == expected._repr_latex_()
+    # The columns are referenced, not copied
+    assert t.rows[1]._store.columns[1] is cols[1]
+
+def test_render_creates_no_cells():
+    t = Table((1, 2, 3), (4, 5, 6))
+    c = Table.from_columns([range(100), range(100)])
+    t._repr_html_()
+    t._repr_latex_()
+    c._repr_html_()
+    assert not any(isinstance(v, TableCell) for r in t.rows for v in r._slots)
+    assert c.rows[0]._store.cells == {}
+
+def test_cell_materialised_on_demand():
+    t = Table.from_columns([[1, 2, 3], [4, 5, 6]])
+    cell = t.cell(1, 0)
+    assert isinstance(cell, TableCell) and cell.value == 2
+    assert t.cell(1, 0) is cell
+    assert list(t.rows[0]._store.cells) == [1]
+    cell.bg_colour = 'red'
+    cell.col_span = 2
+    html = t._repr_html_()
+    assert 'background-color:red' in html
+    assert 'colspan="2"' in html
+    assert html.count('<td') == 5
+
+def test_short_columns_padded():
+    t = Table({'a': [1, 2, 3], 'b': [4]})
+    assert [r._slots for r in t.rows[1:]] == [[1, 4], [2, ''], [3, '']]
+    assert t.cell(2, 1).value == ''
+    with pytest.raises(IndexError):
+        t.cell(1, 2)
+
+def test_replace_cells():
+    t = Table({'a': [1, 2, 3], 'b': [4, 5, 6]})
+    t._repr_html_()
+    row = t.rows[2]
+    row.cells = [TableCell('x', bg_colour='red'), 'y']
+    assert row._slots[1] == 'y' and row.cells[0].value == 'x'
+    assert t.cell(2, 0)._row is row
+    html = t._repr_html_()
+    assert 'background-color:red' in html and '>y</td>' in html
+    assert t.cell(1, 1).value == 4 # Other rows unchanged
+    with pytest.raises(TypeError):
+        row.cells = [1, 2, 3]
+    with pytest.raises(TypeError):
+        row.append_cell(7)
+
+def test_numpy_columns():
+    np = pytest.importorskip('numpy')
+    data = np.arange(12, dtype=float).reshape(3, 4)
+    t = Table.from_columns(list(data.T))
+    assert t._repr_html_() == Table(*data.tolist())._repr_html_()
+
+def test_mapping_values_iterated():
+    t = Table({'a': {'p': 1, 'q': 2}, 'b': (x * 2 for x in (3, 4))})
+    assert [r._slots for r in t.rows[1:]] == [['p', 6], ['q', 8]]
+
+def test_series_values():
+    pd = pytest.importorskip('pandas')
+    df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}, index=[10, 20])
+    for t in (Table({'a': df['a']}), Table(dict(df))):
+        assert t.cell(1, 0).value == 1 and t.cell(2, 0).value == 2
+    assert '<td  >y</td>' in Table(dict(df))._repr_html_()
@@ -0,0 +1,70 @@
+import re
+import pytest
+from tabipy import Table, TableCell, TableHeaderRow
+
+@pytest.fixture
+def t():
+    t = Table(TableHeaderRow('a', 'b'), (1, 2), (3, 4), (5, 6))
+    for r, c in [(1, 0), (2, 1), (3, 0)]:
+        t.cell(r, c).bg_colour = 'red'
+        t.cell(r, c).text_colour = 'white'
+    t.cell(1, 1).bg_colour = 'green'
+    return t
+
+def cell_values(html):
+    return re.findall('<t[dh][^>]*>([^<]*)</t[dh]>', html)
+
+def test_style_block(t):
+    html = t.render('html_compact')
+    assert '<table class="tabipy">' in html
+    rules = re.findall(r'\.tabipy \.([\w-]+)\{([^}]*)\}', html)
+    assert sorted(css for name, css in rules) == [
+        'background-color:green', 'background-color:red;color:white']
+    assert html.count('<style>') == 1
+    assert 'style=' not in html
+    assert sorted(name for name, css in rules) == ['bgreen', 'bred-twhite']
+    assert html.count('class="bred-twhite"') == 3
+    assert cell_values(html) == cell_values(t.render('html'))
+
+def test_no_padding():
+    t = Table(TableHeaderRow('a', 'b'), (1, 2))
+    t.cell(1, 0).col_span = 2
+    assert t.render('html_compact') == ('<table>\n'
+                                        '<tr><th>a</th><th>b</th></tr>\n'
+                                        '<tr><td colspan="2">1</td></tr>\n'
+                                        '</table>')
+
+def test_bytes_saved(t):
+    saved = t.html_bytes_saved()
+    assert saved == len(t.render('html')) - len(t.render('html_compact'))
+    big = Table(*[[TableCell(i, bg_colour='#eee') for i in range(10)]
+                  for r in range(100)])
+    assert big.html_bytes_saved() > len(big.render('html')) // 3
+
+def test_rowspan_from_above_page(t):
+    t.cell(1, 0).row_span = 3
+    t.compact_html = True
+    html = t.page(1, 1)._repr_html_()
+    assert '<td class="bred-twhite">1</td>' in html
+    assert cell_values(html) == ['a', 'b', '1', '4']
+
+def test_display_option(t):
+    assert 'style=' in t._repr_html_()
+    t.compact_html = True
+    assert '<style>' in t._repr_html_()
+
+def test_cached_rows_follow_changes(t):
+    t.render('html_compact')
+    t.cell(2, 0).bg_colour = 'green'
+    html = t.render('html_compact')
+    assert '<td class="bgreen">3</td>' in html
+
+def test_class_names():
+    t = Table([TableCell(1, bg_colour='#eee'),
+               TableCell(2, text_colour='rgb(0, 0, 0)'),
+               TableCell(3, bg_colour='eee')])
+    html = t.render('html_compact')
+    assert ['Beee', 'beee', 'trgb_28_0_2c__20_0_2c__20_0_29_'] == sorted(
+        re.findall(r'\.tabipy \.([\w-]+)\{', html))
+    # Names don't depend on what was rendered before
+    assert html == t.render('html_compact')
@@ -0,0 +1,78 @@
+from collections import namedtuple
+import pytest
+from tabipy import Table, TableHeaderRow
+
+def test_from_records_mappings():
+    records = ({'a': i, 'b': i * 2} for i in range(3))
+    t = Table.from_records(records)
+    expected = Table(TableHeaderRow('a', 'b'), (0, 0), (1, 2), (2, 4))
+    assert t._repr_html_() == expected._repr_html_()
+    t = Table.from_records([{'a': 1, 'b': 2}, {'a': 3}], columns=['b', 'a'])
+    assert [r._slots for r in t.rows] == [['b', 'a'], [2, 1], ['', 3]]
+
+def test_from_records_tuples():
+    Point = namedtuple('Point', 'x y')
+    t = Table.from_records(iter([Point(1, 2), Point(3, 4)]))
+    assert [r._slots for r in t.rows] == [['x', 'y'], [1, 2], [3, 4]]
+    t = Table.from_records([(1, 2), (3,)], header=False)
+    assert [r._slots for r in t.rows] == [[1, 2], [3, '']]
+    assert Table.from_records([]).rows == []
+
+def test_formats():
+    t = Table.from_records([{'name': 'a', 'x': 1234.5, 'p': 0.25}],
+                           formats={'x': '{:,.2f}', 'p': '.0%'})
+    html = t._repr_html_()
+    assert '<td  >1,234.50</td>' in html and '<td  >25%</td>' in html
+    assert '<th  >x</th>' in html
+    assert t.cell(1, 1).value == 1234.5
+    t.set_format(1, '%.1f')
+    t.set_format('name', str.upper)
+    assert '<td  >1234.5</td><td  >25%</td>' in t._repr_html_()
+    assert 'A & 1234.5 & ' in t._repr_latex_()
+    t.set_format('x', None)
+    assert '<td  >1234.5</td>' in t._repr_html_()
+    with pytest.raises(KeyError):
+        t.set_format('missing', '.2f')
+
+def test_formats_span_into_page():
+    t = Table(*[(float(r), r) for r in range(1, 5)])
+    t.set_format(0, '.2f')
+    t.cell(0, 0).row_span = 4 # Covers 2.0, 3.0 and 4.0
+    page = t.page(1, 2) # Rows 2 and 3, inside the span
+    assert '<td rowspan="2" >1.00</td>' in page._repr_html_()
+    assert r'\multirow{2}{*}{1.00}' in page._repr_latex_()
+    assert '1.00' in page.to_text() and '3.00' not in page.to_text()
+
+def test_from_array():
+    np = pytest.importorskip('numpy')
+    a = np.arange(6.0).reshape(3, 2)
+    t = Table.from_array(a, header=['x', 'y'], formats={1: '.1f'})
+    assert np.shares_memory(t.rows[1]._store.columns[0], a)
+    assert '<td  >0.0</td><td  >1.0</td>' in t._repr_html_()
+    assert len(Table.from_array(a[:, 0]).rows) == 3
+    with pytest.raises(ValueError):
+        Table.from_array(np.zeros((2, 2, 2)))
+
+def test_from_structured_array():
+    np = pytest.importorskip('numpy')
+    a = np.array([(1, 2.5), (2, 3.5)], dtype=[('n', 'i8'), ('v', 'f8')])
+    t = Table.from_records(a)
+    assert [r._slots for r in t.rows][0] == ['n', 'v']
+    assert np.shares_memory(t.rows[1]._store.columns[1], a)
+    assert '<td  >1</td><td  >2.5</td>' in t._repr_html_()
+
+def test_from_dataframe():
+    pd = pytest.importorskip('pandas')
+    np = pytest.importorskip('numpy')
+    values = np.arange(6.0).reshape(3, 2)
+    df = pd.DataFrame(values, columns=['x', 'y'],
+                      index=pd.Index(['a', 'b', 'c'], name='key'))
+    t = Table.from_dataframe(df, formats={'y': '.2f'})
+    html = t._repr_html_()
+    assert '<tr><th  >key</th><th  >x</th><th  >y</th></tr>' in html
+    assert '<tr><th  >a</th><td  >0.0</td><td  >1.00</td></tr>' in html
+    assert t.cell(1, 0).header
+    assert r'\bf b & 2.0 & 3.00\\' in t._repr_latex_()
+    assert np.shares_memory(t.rows[1]._store.columns[1], df['x'].values)
+    t = Table.from_dataframe(df, index=False, header=False)
+    assert '<tr><td  >0.0</td><td  >1.0</td></tr>' in t._repr_html_()
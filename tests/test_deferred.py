@@ -0,0 +1,69 @@
+import pytest
+from tabipy import Table, TableCell, TableHeaderRow, Deferred
+
+class Source(object):
+    "Stands in for an expensive lookup, counting the calls made."
+    def __init__(self):
+        self.calls = []
+    def get(self, key):
+        def func():
+            self.calls.append(key)
+            return 'value %d' % key
+        return Deferred(func)
+
+def test_only_rendered_cells_evaluated():
+    src = Source()
+    t = Table(TableHeaderRow('k', 'v'), *[(i, src.get(i)) for i in range(50)])
+    html = t.page(2, 5).render()
+    assert src.calls == list(range(10, 15))
+    assert '<td  >value 12</td>' in html
+    t.page(2, 5).render('latex')
+    t.clear_render_cache()
+    t.page(2, 5).render('text')
+    assert src.calls == list(range(10, 15)) # Kept once worked out
+
+def test_in_cells():
+    d = Deferred(lambda: 42)
+    t = Table((TableCell(d, bg_colour='red'), 1))
+    assert not d.evaluated
+    assert '>42</td>' in t.render()
+    assert d.evaluated and d.value == 42
+    assert t.cell(0, 0).value is d
+
+def test_truncated():
+    d = Deferred(lambda: 'x' * 5000)
+    assert str(d) == 'x' * 1000 + '...'
+    assert d.value == 'x' * 5000
+    assert str(Deferred(lambda: 'x' * 5000, max_chars=None)) == 'x' * 5000
+    d = Deferred(lambda: {'a': list(range(10 ** 6))}, max_chars=20)
+    assert str(d) == "{'a': [0, 1, 2, 3, 4..."
+    small = {'a': (1, 2.5, None), 'b': [set([1]), frozenset([2]), ()]}
+    assert str(Deferred(lambda: small)) == str(small)
+
+def test_formats():
+    t = Table(TableHeaderRow('x'), (Deferred(lambda: 1.23456),),
+              (Deferred(lambda: 2),))
+    t.set_format('x', '.2f')
+    assert '<td  >1.23</td>' in t.render()
+    assert '<td  >2.00</td>' in t.render()
+    t.set_format('x', '%.1f')
+    assert '1.2\\\\' in t.render('latex')
+
+def test_views_and_rules_see_values():
+    from tabipy import Highlight
+    t = Table(TableHeaderRow('k', 'v'),
+              *[(i, Deferred(lambda i=i: 10 - i)) for i in range(5)])
+    t.cell(2, 1).row_span = 2
+    index = t.index('v')
+    assert index[10] == [1] and index[9] == [2, 3] # Row 3 is covered
+    assert [r.cells[0].value for r in t.sort_by('v').rows[1:]] == [
+        4, 3, 1, 2, 0]
+    assert len(t.filter(lambda values: values[1] == 7).rows) == 2
+    t.add_style_rule(Highlight('v', above=9, bg_colour='red'))
+    assert t.render().count('background-color:red') == 1
+
+def test_saved_as_values():
+    t = Table((1, Deferred(lambda: 2)), (3, Deferred(lambda: [4])))
+    copy = Table.from_bytes(t.to_bytes())
+    assert [r._slots for r in copy.rows] == [[1, 2], [3, [4]]]
+    assert copy.render() == t.render()
@@ -0,0 +1,84 @@
+import re
+import pytest
+from tabipy import Table, TableHeaderRow, TableView
+
+def big_table(nrows, ncols=3):
+    return Table(TableHeaderRow(*['c%d' % c for c in range(ncols)]),
+                 *[[r * ncols + c for c in range(ncols)] for r in range(nrows)])
+
+def test_row_truncation():
+    t = big_table(250)
+    html = t._repr_html_()
+    assert html.count('<tr>') == t.max_rows + 1
+    assert '<tr><td  >...</td><td  >...</td><td  >...</td></tr>' in html
+    assert '<th  >c0</th>' in html
+    assert '<td  >749</td>' in html # last row
+    assert html != ''.join(t.iter_html())
+    assert ''.join(t.iter_html()).count('<tr>') == 251
+
+def test_column_truncation():
+    t = big_table(2, ncols=80)
+    t.cell(1, 20).col_span = 20
+    html = t._repr_html_()
+    cells = re.compile('<t[dh][^>]*>([^<]*)</t[dh]>')
+    lines = html.split('\n')
+    plain = cells.findall(lines[3])
+    assert len(plain) == t.max_cols + 1
+    assert plain[24:27] == ['104', '...', '135']
+    # The col span is cut to the visible columns
+    spanned = cells.findall(lines[2])
+    assert len(spanned) == 20 + 1 + 1 + 25
+    assert 'colspan="5"  >20<' in lines[2]
+
+def test_small_table_not_truncated():
+    t = big_table(10)
+    assert t._repr_html_() == ''.join(t.iter_html())
+
+def test_page():
+    t = big_table(10)
+    page = t.page(1, 4)
+    assert isinstance(page, TableView)
+    assert page.rows == [t.rows[0]] + t.rows[5:9]
+    html = page._repr_html_()
+    assert html.count('<tr>') == 5
+    assert '<td  >12</td>' in html and '<td  >11</td>' not in html
+    latex = page._repr_latex_()
+    assert latex.count(r'\\') == 5
+    assert t.page(2, 4).rows[1:] == t.rows[9:]
+    with pytest.raises(IndexError):
+        t.page(3, 4)
+
+def test_page_spans_cut_at_edges():
+    t = Table(*[(r, r) for r in range(6)])
+    t.cell(1, 0).row_span = 3 # covers rows 1-3
+    t.cell(3, 1).row_span = 3 # covers rows 3-5
+    page = t.page(1, 2) # rows 2 and 3
+    html = page._repr_html_()
+    rows = html.split('\n')[1:3]
+    # The span from row 1 shows at the top of the page, cut to two rows
+    assert rows[0] == '<tr><td rowspan="2" >1</td><td  >2</td></tr>'
+    # The span starting in row 3 is cut to the one row left on the page
+    assert rows[1] == '<tr><td  >3</td></tr>'
+    latex = page._repr_latex_()
+    assert r'\multirow{2}{*}{1} & 2\\' in latex
+    # Rendering the view doesn't change the table
+    assert t.cell(1, 0).row_span == 3
+    assert t._repr_html_().count('rowspan="3"') == 2
+
+def test_page_follows_changes_above():
+    t = Table(*[(r, r) for r in range(6)])
+    t.cell(1, 0).row_span = 3
+    page = t.page(1, 2) # rows 2 and 3, under the span from row 1
+    assert '>1</td>' in page._repr_html_()
+    t.cell(1, 0).value = 'CHANGED'
+    assert '>CHANGED</td>' in page._repr_html_()
+    assert 'CHANGED' in page._repr_latex_()
+    t.cell(1, 0).bg_colour = 'red'
+    assert 'red' in page._repr_html_()
+
+def test_truncated_view_follows_changes_above():
+    t = big_table(250)
+    t.cell(200, 0).row_span = 10 # Across the cut before the last rows
+    assert '>597</td>' in t._repr_html_()
+    t.cell(200, 0).value = 'CHANGED'
+    assert '>CHANGED</td>' in t._repr_html_()
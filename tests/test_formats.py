@@ -0,0 +1,81 @@
+import datetime
+import pytest
+from tabipy import Table, TableHeaderRow, _formatter, _format_values
+
+class Counting(object):
+    "A formatter counting the values it formats."
+    def __init__(self):
+        self.calls = 0
+    def __call__(self, value):
+        self.calls += 1
+        return '<%s>' % (value,)
+
+def test_formatted_once_for_all_renders():
+    fmt = Counting()
+    t = Table(TableHeaderRow('a', 'b'), (1, 2), (3, 4))
+    t.set_format('b', fmt)
+    t.render('html')
+    t.render('latex')
+    t.render('html_compact')
+    assert fmt.calls == 2
+    assert '<td  ><4></td>' in t.render('html')
+
+def test_value_setter_invalidates():
+    fmt = Counting()
+    t = Table((1, 2), (3, 4))
+    t.set_format(1, fmt)
+    t.render()
+    t.cell(1, 1).value = 40
+    assert '<td  ><40></td>' in t.render()
+    assert fmt.calls == 3
+    t.set_format(1, '{:.1f}')
+    assert '<td  >40.0</td>' in t.render()
+
+def test_columns_formatted_once():
+    fmt = Counting()
+    t = Table.from_columns([list(range(3000)), list(range(3000))])
+    t.set_format(0, fmt)
+    t.render('html')
+    t.render('latex')
+    assert fmt.calls == 3000
+    t.cell(5, 0).value = 'x'
+    assert '<td  ><x></td>' in t.render()
+    assert fmt.calls == 3001
+    t.clear_render_cache()
+    t.render()
+    assert fmt.calls == 6002 # The block, then the cell set in it
+
+def test_dates():
+    t = Table((datetime.date(2020, 1, 2), 1.5))
+    t.set_format(0, '%Y-%m-%d')
+    t.set_format(1, '%.2f')
+    assert '<td  >2020-01-02</td><td  >1.50</td>' in t.render()
+
+@pytest.mark.parametrize('spec', ['.2f', '{:.3e}', '{0:+08.1f}', '%.1f kg',
+                                  '%d items', '%s', '{:,.2f}', 'g', '.0%',
+                                  '-8.2f', '{:-08.1f}'])
+def test_blocks_match_values(spec):
+    np = pytest.importorskip('numpy')
+    fmt = _formatter(spec)
+    for values in [np.linspace(-5, 5, 41), np.arange(20),
+                   np.linspace(0, 1, 7, dtype=np.float32)]:
+        assert _format_values(values, fmt) == [fmt(v) for v in values]
+
+def test_array_columns():
+    np = pytest.importorskip('numpy')
+    a = np.arange(3000.) / 7
+    t = Table.from_array(a, formats={0: '.3f'})
+    html = t.render()
+    assert '<td  >%.3f</td>' % a[2999] in html
+    assert len(t.rows[0]._store.formatted) == 3
+
+def test_array_and_list_columns_match():
+    np = pytest.importorskip('numpy')
+    values = [1.5, -2.25, 30.]
+    by_array = Table.from_array(np.array(values))
+    by_rows = Table(*[(v,) for v in values])
+    for spec in ('-8.2f', '{:-8.2f}', '+8.2f', ' 8.2f'):
+        by_array.set_format(0, spec)
+        by_rows.set_format(0, spec)
+        assert by_array.render() == by_rows.render()
+    assert '<td  >   30.00</td>' in by_array.render()
@@ -0,0 +1,34 @@
+import random
+from tabipy import TableCell, _LatexEscaper
+
+def reference(value):
+    return TableCell._latex_escape_re.sub(TableCell._latex_escape_func,
+                                          str(value))
+
+def test_matches_regex_escaping():
+    rng = random.Random(0)
+    alphabet = 'ab &\\~$\r\n_{}'
+    values = [''.join(rng.choice(alphabet) for i in range(rng.randint(0, 8)))
+              for j in range(2000)]
+    values += [0, -3, 2.5, float('nan'), True, None, ('a_b', 1)]
+    escaper = _LatexEscaper(maxsize=50)
+    assert escaper.many(values) == [reference(v) for v in values]
+    # Second pass goes through the memo
+    assert escaper.many(values) == [reference(v) for v in values]
+    assert [escaper.escape(v) for v in values] == [reference(v) for v in values]
+
+def test_memo_bounded():
+    escaper = _LatexEscaper(maxsize=10)
+    escaper.many(['label_%d' % (i % 30) for i in range(100)])
+    assert len(escaper._memo) == 10
+    escaper.many(['x' * 500])
+    assert 'x' * 500 not in escaper._memo
+    # Numbers skip the memo entirely
+    escaper.many(range(100))
+    assert all(isinstance(k, str) and k.startswith('label')
+               for k in escaper._memo)
+
+def test_memo_recently_used_kept():
+    escaper = _LatexEscaper(maxsize=2)
+    escaper.many(['a_', 'b_', 'a_', 'c_'])
+    assert list(escaper._memo) == ['a_', 'c_']
@@ -0,0 +1,67 @@
+import warnings
+import pytest
+from tabipy import Table, TableHeaderRow
+
+@pytest.fixture
+def t():
+    t = Table(TableHeaderRow('a', 'b'), *[(i, i * 2) for i in range(7)])
+    t.cell(2, 0).row_span = 3
+    t.cell(3, 1).row_span = 2
+    return t
+
+def render_warnings(func, *args):
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        out = ''.join(func(*args))
+    return out, [str(x.message) for x in w]
+
+def test_one_warning_per_render(t):
+    latex, messages = render_warnings(t.iter_latex)
+    assert latex.count('\\multirow') == 2
+    assert len(messages) == 1
+    assert 'multirow' in messages[0]
+
+def test_no_warning_without_spans():
+    t = Table(TableHeaderRow('a', 'b'), (1, 2))
+    latex, messages = render_warnings(t.iter_latex)
+    assert messages == []
+
+def test_longtable(t):
+    latex, messages = render_warnings(t.render, 'longtable')
+    assert latex.startswith('\\begin{longtable}{*{2}{l}}\n')
+    assert latex.endswith('\\end{longtable}')
+    lines = latex.split('\n')
+    assert lines.index('\\endhead') == 4 # After the header row
+    assert latex.count('\\bf a') == 1
+    assert len(messages) == 1
+    assert '\\usepackage{longtable,multirow}' in messages[0]
+
+def test_chunks_repeat_header(t):
+    latex, messages = render_warnings(t.iter_latex_chunks, 2)
+    assert latex.count('\\begin{tabular}') == 3
+    assert latex.count('\\end{tabular}') == 3
+    assert latex.count('\\bf a') == 3
+    assert len(messages) == 1
+
+def test_chunks_keep_row_spans_whole(t):
+    chunks = [view.segments for view in t._latex_chunks(2)]
+    # Rows 2-5 are tied together by the row spans
+    assert chunks == [[(0, 1), (1, 5)], [(0, 1), (5, 7)], [(0, 1), (7, 8)]]
+    latex, messages = render_warnings(t.iter_latex_chunks, 2)
+    first = latex.split('\\end{tabular}')[0]
+    assert '\\multirow{3}{*}{1}' in first
+    assert '\\multirow{2}{*}{4}' in first
+
+def test_chunks_without_header():
+    t = Table(*[(i,) for i in range(5)])
+    latex, messages = render_warnings(t.iter_latex_chunks, 2)
+    assert latex.count('\\begin{tabular}') == 3
+    assert '\\hline' not in latex
+    with pytest.raises(ValueError):
+        list(t.iter_latex_chunks(0))
+
+def test_repr_latex_chunk_rows(t):
+    assert t._repr_latex_().count('\\begin{tabular}') == 1
+    t.latex_chunk_rows = 2
+    latex, messages = render_warnings(t._repr_latex_)
+    assert latex.count('\\begin{tabular}') == 3
@@ -0,0 +1,74 @@
+import pytest
+from tabipy import Table, TableCell
+
+@pytest.fixture
+def t():
+    "Returns a table with a cell spanning two rows and two columns"
+    t = Table((1,2,3),
+              (4,5,6),
+              (7,8,9))
+    cell = t.cell(0,1)
+    cell.row_span = 2
+    cell.col_span = 2
+    return t
+
+def test_layout_entries(t):
+    layout = t._get_layout()
+    assert [e[:3] for e in layout.entries[0]] == [(0,1,1), (1,2,2)]
+    # Row 1 gets a placeholder for the two columns covered from above
+    assert [e[:3] for e in layout.entries[1]] == [(0,1,1), (1,0,2)]
+    assert layout.entries[2] is None
+    assert list(layout.incoming) == [1]
+
+def test_layout_cached(t):
+    layout = t._get_layout()
+    t._repr_html_()
+    t._repr_latex_()
+    assert t._get_layout() is layout
+
+def test_layout_invalidated(t):
+    layout = t._get_layout()
+    t.cell(2,0).col_span = 3
+    assert t._get_layout() is not layout
+    assert t._get_layout().entries[2] == [(0, 1, 3, t.cell(2,0))]
+    layout = t._get_layout()
+    t.append_row((10, 11, 12))
+    assert t._get_layout() is layout # Extended for the new row
+    assert t._get_layout().entries[3] is None
+
+def test_render_uses_layout(t):
+    html = t._repr_html_()
+    assert html.count('<td') == 6
+    assert 'rowspan="2"' in html
+    latex = t._repr_latex_()
+    assert r'\multicolumn{2}{l}{}' in latex
+
+def test_layout_rows_inserted(t):
+    t._repr_html_()
+    t.append_row((10, 11, 12))
+    t._repr_html_()
+    t.rows.insert(0, t.rows.pop(3))
+    assert t._get_layout().entries[0] is None
+    html = t._repr_html_()
+    assert html.index('>10</td>') < html.index('>1</td>')
+    assert html.index('>1</td>') < html.index('>2</td>')
+    assert html.count('rowspan') == 1
+
+def test_layout_row_replaced(t):
+    t._repr_html_()
+    t.rows[0] = Table((0, 0, 0)).rows[0]
+    html = t._repr_html_()
+    assert 'rowspan' not in html
+    assert html.count('>0</td>') == 3 and '>5</td>' in html
+
+def test_layout_middle_row_replaced(t):
+    t._repr_html_()
+    t.rows[1] = Table((0, 0, 0)).rows[0]
+    t.clear_render_cache()
+    assert t._get_layout().rows[1] is t.rows[1]
+    assert '<tr><td  >0</td></tr>' in t._repr_html_()
+
+def test_index_rows_reordered(t):
+    assert t.index(0)[7] == [2]
+    t.rows.reverse()
+    assert t.index(0)[7] == [0]
@@ -0,0 +1,92 @@
+import pytest
+from tabipy import (Table, TableHeaderRow, TableRow, LiveTable,
+                    RecordingPublisher, DisplayPublisher)
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+def live_table(clock, **kwargs):
+    kwargs.setdefault('min_interval', 1)
+    return LiveTable(Table(TableHeaderRow('a', 'b')), clock=clock,
+                     publisher=RecordingPublisher(), **kwargs)
+
+def test_throttled_updates(clock):
+    lt = live_table(clock, window=3)
+    for i in range(10):
+        lt.append_row((i, i * i))
+        clock.now += 0.4
+    handles = [h for h, html in lt.publisher.messages]
+    assert handles == [0, 0, 0, 0] # t = 0, 1.2, 2.4, 3.6
+    assert lt.rows_sent == 11
+    lt.append_row((10, 100)) # Too soon after the last update
+    assert lt.rows_sent == 11
+    lt.flush()
+    assert lt.rows_sent == 12
+    html = lt.publisher.outputs[0]
+    assert '<th  >a</th>' in html
+    assert '<td  >...</td>' in html
+    assert html.count('<tr>') == 5
+    assert '<td  >100</td>' in html
+
+def test_flush_without_new_rows(clock):
+    lt = live_table(clock)
+    lt.flush()
+    lt.flush()
+    assert len(lt.publisher.messages) == 1
+
+def test_close_shows_table(clock):
+    with live_table(clock, window=2) as lt:
+        lt.extend_rows([(i, i) for i in range(5)])
+    assert lt.publisher.outputs == [lt.table._repr_html_()]
+    assert lt.publisher.outputs[0].count('<tr>') == 6
+
+def test_update_size_bounded(clock):
+    lt = live_table(clock, min_interval=0, window=10)
+    sizes = []
+    for i in range(5000):
+        lt.append_row((i, i))
+        sizes.append(len(lt.publisher.messages[-1][1]))
+    assert max(sizes) < 600
+    # The window rows aren't kept as it moves down the table
+    assert lt.table.render_cache_info().cached_rows == 0
+
+def test_update_time_bounded(clock, monkeypatch):
+    lt = live_table(clock, min_interval=0, window=10)
+    lt.extend_rows([(i, i) for i in range(5000)])
+    rendered = []
+    render = TableRow._render
+    def counted(self, *args):
+        rendered.append(self)
+        return render(self, *args)
+    monkeypatch.setattr(TableRow, '_render', counted)
+    layout = lt.table._get_layout()
+    lt.append_row((1, 1))
+    assert len(rendered) <= 12 # The header and window rows
+    assert lt.table._get_layout() is layout
+
+def test_layout_extended_for_appended_rows():
+    t = Table(TableHeaderRow('a', 'b'), (1, 2), (3, 4))
+    t.cell(1, 0).row_span = 3
+    layout = t._get_layout()
+    before = list(layout.entries)
+    t.append_row((5, 6))
+    t.append_row((7, 8))
+    extended = t._get_layout()
+    assert extended is layout
+    assert extended.entries[:3] == before
+    assert extended.entries[3] == [(0, 0, 1, None), (1, 1, 1, 6)]
+    assert extended.entries[4] is None
+    assert ''.join(t.iter_html()) == ''.join(Table(*t.rows).iter_html())
+
+def test_display_publisher():
+    pytest.importorskip('IPython')
+    p = DisplayPublisher()
+    handle = p.display('<b>x</b>')
+    p.update(handle, '<b>y</b>')
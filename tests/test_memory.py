@@ -0,0 +1,90 @@
+import warnings
+import pytest
+from tabipy import (Table, TableCell, TableHeaderRow, TableRow, MemoryUsage,
+                    MemoryBudgetError)
+
+@pytest.fixture
+def t():
+    t = Table(TableHeaderRow('a', 'b', 'c'),
+              *[(i, 'x%d' % i, i / 2.0) for i in range(500)])
+    t.cell(1, 0).bg_colour = 'red'
+    t.cell(2, 0).bg_colour = 'red'
+    t.append_row(TableRow(TableCell('wide', col_span=3)))
+    return t
+
+def test_categories(t):
+    usage = t.memory_usage()
+    assert isinstance(usage, MemoryUsage)
+    assert usage.total == sum(usage[:-1])
+    assert usage.cells > 0 and usage.values > 0 and usage.rows > 0
+    assert usage.placeholders > 0 # From the column span
+    assert t.memory_usage(deep=False).values == 0
+
+def test_caches_counted(t):
+    before = t.memory_usage()
+    t.max_rows = None
+    html = t._repr_html_() # Displaying fills the row caches
+    t.index('b')
+    after = t.memory_usage()
+    assert after.rendered > before.rendered + len(html)
+    assert after.layout > before.layout
+    t.clear_render_cache()
+    assert t.memory_usage().rendered == before.rendered
+
+def test_shared_style_counted_once(t):
+    styles = t.memory_usage().styles
+    t.cell(5, 0).bg_colour = 'red'
+    assert t.memory_usage().styles == styles
+
+def test_columns():
+    np = pytest.importorskip('numpy')
+    t = Table.from_array(np.zeros((1000, 4)))
+    assert t.memory_usage().values >= 32000
+
+def test_budget_on_loading():
+    class Small(Table):
+        memory_budget = 20000
+    t = Small()
+    with pytest.raises(MemoryBudgetError):
+        t.extend_rows((i, 'row %d' % i) for i in range(1000))
+    assert 0 < len(t.rows) < 1000
+    assert 19000 < t.memory_usage().total < 22000
+    with pytest.raises(MemoryBudgetError):
+        Small.from_columns([list(range(1000))])
+
+def test_budget_on_render(t):
+    t.memory_budget = t.memory_usage().total + 1000
+    with pytest.raises(MemoryBudgetError):
+        t.render()
+    t.memory_budget_warn = True
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        html = t.render()
+    assert len(w) == 1 and 'memory_budget' in str(w[0].message)
+    assert html.count('<tr>') == 502
+
+def test_budget_loading_row_by_row():
+    class Small(Table):
+        memory_budget = 1000000
+    t = Small()
+    for i in range(2000):
+        t.extend_rows([(i, 'row %d' % i)])
+    # Counted once for the first call, then carried on
+    assert t._budget_used[0] == 2000
+    estimate = t._budget_used[1]
+    assert abs(estimate - t.memory_usage().total) < estimate // 10
+    t.cell(0, 0).value = 'x'
+    assert t._budget_used is None
+    t.memory_budget = t.memory_usage().total + 100
+    with pytest.raises(MemoryBudgetError):
+        t.extend_rows([(i, 'row %d' % i) for i in range(10)])
+
+def test_budget_on_display(t):
+    t.memory_budget = t.memory_usage().total + 1000
+    with pytest.raises(MemoryBudgetError):
+        t._repr_latex_()
+    t.max_rows = None
+    with pytest.raises(MemoryBudgetError):
+        t._repr_html_()
+    t.memory_budget = None
+    assert t._repr_html_().count('<tr>') == 502
@@ -0,0 +1,53 @@
+import multiprocessing
+import sys
+import warnings
+import pytest
+from tabipy import Table, TableHeaderRow
+
+@pytest.fixture
+def t():
+    "Returns a 500 row table with spans crossing chunk boundaries"
+    t = Table(TableHeaderRow('a', 'b', 'c'),
+              *[(r, 'v_%d' % r, r / 4.0) for r in range(500)])
+    for r in range(5, 495, 7):
+        t.cell(r, 0).row_span = 4
+        t.cell(r + 1, 1).col_span = 2
+    t.parallel_min_rows = 100
+    return t
+
+@pytest.mark.parametrize('fmt', ['html', 'latex'])
+def test_thread_pool_matches_serial(t, fmt):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        serial = t.render(fmt)
+        assert serial == ''.join(t._iter_format(fmt))
+        for chunk_rows in (None, 1, 3, 64):
+            assert t.render(fmt, workers=4, chunk_rows=chunk_rows) == serial
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                    reason='needs fork')
+def test_process_pool_matches_serial(t):
+    for r in range(1, 500, 3):
+        t.cell(r, 2).bg_colour = '#%03x' % r
+    for fmt in ('html', 'html_compact', 'latex'):
+        assert t.render(fmt, workers=2, executor='process') == t.render(fmt)
+
+def test_small_tables_rendered_serially(t, monkeypatch):
+    t.parallel_min_rows = 1000
+    def fail(*args):
+        raise AssertionError("rendered in chunks")
+    monkeypatch.setattr(t, '_render_chunk', fail)
+    assert t.render('html', workers=4) == ''.join(t.iter_html())
+
+def test_without_futures(t, monkeypatch):
+    # As on Python 2 without the futures backport
+    import concurrent
+    monkeypatch.delattr(concurrent, 'futures')
+    monkeypatch.setitem(sys.modules, 'concurrent.futures', None)
+    assert t.render('html', workers=4) == ''.join(t.iter_html())
+
+def test_bad_arguments(t):
+    with pytest.raises(ValueError):
+        t.render('rtf')
+    with pytest.raises(ValueError):
+        t.render('html', workers=2, executor='cluster')
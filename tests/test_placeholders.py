@@ -0,0 +1,43 @@
+from tabipy import Table, TableCell, TableHeader, SpanPlaceholder
+
+def merged_header():
+    return Table((TableHeader('group', col_span=3), TableHeader('other')),
+                 (1, 2, 3, 4))
+
+def test_covered_positions_not_cells():
+    t = merged_header()
+    slots = t.rows[0]._slots
+    assert len(slots) == 4
+    assert not any(isinstance(c, TableCell) for c in slots[1:3])
+    assert t.rows[0].column_count() == 4
+
+def test_cell_gives_placeholder():
+    t = merged_header()
+    p = t.cell(0, 2)
+    assert isinstance(p, SpanPlaceholder)
+    assert p.value == ''
+    assert p.covered_by is t.cell(0, 0)
+    # Looking at the row's cells doesn't fill it with placeholders
+    assert [type(c).__name__ for c in t.rows[0].cells] == [
+        'TableHeader', 'SpanPlaceholder', 'SpanPlaceholder', 'TableHeader']
+    assert not isinstance(t.rows[0]._slots[1], TableCell)
+
+def test_rendering_unchanged():
+    t = merged_header()
+    assert '<th colspan="3"  >group</th><th  >other</th></tr>' in t.render()
+    assert '\\multicolumn{3}{l}{\\bf group} & \\bf other' in t.render('latex')
+
+def test_changed_placeholder_kept():
+    t = merged_header()
+    t.cell(0, 1).value = 'hidden'
+    assert 'hidden' not in t.render()
+    assert isinstance(t.rows[0]._slots[1], SpanPlaceholder)
+    t.cell(0, 0).col_span = 1
+    assert '<th  >group</th><td  >hidden</td><td  ></td>' in t.render()
+    assert t.cell(0, 2).covered_by is None
+
+def test_replace_placeholder():
+    t = merged_header()
+    t.rows[0].cells[2] = TableCell('new')
+    t.cell(0, 0).col_span = 2
+    assert '<th colspan="2"  >group</th><td  >new</td>' in t.render()
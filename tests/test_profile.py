@@ -0,0 +1,58 @@
+import pytest
+from tabipy import Table, TableHeaderRow, RenderStats
+
+@pytest.fixture
+def t():
+    t = Table(TableHeaderRow('a', 'b', 'c'), *[(i, i / 4.0, 'x & y')
+                                               for i in range(20)])
+    t.cell(1, 0).row_span = 3
+    t.cell(5, 1).col_span = 2
+    t.set_format('b', '.2f')
+    return t
+
+def test_counts(t):
+    with t.profile() as prof:
+        html = t.render('html')
+    stats = prof.stats()
+    assert stats.renders == 1
+    assert stats.rows == 21
+    assert stats.cells == 63 - 2 - 1
+    assert stats.spans == 2
+    assert stats.bytes == len(html) - len('<table>\n\n</table>') - 20
+    assert [c for c, s, b in prof.row_counts[:3]] == [3, 3, 2]
+    assert stats.format > 0 and stats.assemble > 0
+
+def test_cache_hits_and_escape_time(t):
+    with t.profile() as prof:
+        t._repr_latex_()
+        t._repr_latex_()
+    stats = prof.stats()
+    assert (stats.renders, stats.cache_misses, stats.cache_hits) == (2, 21, 21)
+    assert stats.escape > 0
+    assert 'row cache: 21 hits, 21 misses' in prof.report()
+
+def test_output_unchanged(t):
+    plain = t.render('html_compact'), t.page(1, 5).render('latex')
+    t.clear_render_cache()
+    with t.profile():
+        profiled = t.render('html_compact'), t.page(1, 5).render('latex')
+    assert profiled == plain
+
+def test_callback_per_render(t):
+    seen = []
+    t.max_rows = 4
+    with t.profile(seen.append):
+        t.render('html')
+        html = t._repr_html_() # A truncated view, with a filler row
+    assert [s.rows for s in seen] == [21, html.count('<tr>')]
+    assert seen[1].rows < 21
+    assert all(isinstance(s, RenderStats) for s in seen)
+
+def test_render_stats(t):
+    stats = t.render_stats()
+    assert stats.renders == 1 and stats.rows == 21
+    with t.profile():
+        t.render('latex')
+        t.render('latex')
+    assert t.render_stats().renders == 2
+    assert t._profiler is None
@@ -0,0 +1,52 @@
+import io
+import pytest
+from tabipy import Table
+
+@pytest.fixture
+def t():
+    "Returns a 5x3 table rendered once as HTML"
+    t = Table(*[(r, r * 10, r * 100) for r in range(5)])
+    t._repr_html_()
+    return t
+
+def test_unchanged_table_hits(t):
+    html = t._repr_html_()
+    info = t.render_cache_info()
+    assert (info.hits, info.misses, info.cached_rows) == (5, 5, 5)
+    assert t._repr_html_() == html
+
+def test_cell_edit_rerenders_one_row(t):
+    cell = t.cell(2, 1)
+    cell.value = 'changed'
+    cell.bg_colour = 'red'
+    html = t._repr_html_()
+    assert 'changed' in html and 'background-color:red' in html
+    assert t.render_cache_info()[:2] == (4, 6)
+
+def test_span_change_rerenders_covered_rows(t):
+    t.cell(1, 0).row_span = 2
+    html = t._repr_html_()
+    assert 'rowspan="2"' in html
+    # Row 1 holds the span, row 2 is covered by it
+    assert t.render_cache_info()[:2] == (3, 7)
+    assert html == Table(*[(r, r * 10, r * 100) for r in range(5)]
+                         )._repr_html_().replace('<td  >1</td>',
+                                                 '<td rowspan="2" >1</td>'
+                         ).replace('<td  >2</td><td  >20</td>', '<td  >20</td>')
+
+def test_clear_render_cache(t):
+    t.clear_render_cache()
+    assert t.render_cache_info() == (0, 0, 0)
+    t.cache_renders = False
+    t._repr_html_()
+    assert t.render_cache_info() == (0, 0, 0)
+
+def test_exports_not_cached():
+    t = Table(*[(r, r * 10, r * 100) for r in range(5)])
+    html = t.render()
+    assert ''.join(t.iter_html()) == html
+    t.to_text()
+    t.write_to(io.StringIO(), 'latex')
+    assert t.render_cache_info() == (0, 0, 0)
+    assert t._repr_html_() == html
+    assert t.render_cache_info() == (0, 5, 5)
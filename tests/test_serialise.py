@@ -0,0 +1,102 @@
+import datetime
+import pickle
+import pytest
+import tabipy
+from tabipy import Table, TableCell, TableHeader, TableHeaderRow, TableRow
+
+def round_trip(t):
+    t2 = Table.from_bytes(t.to_bytes())
+    assert t2.render('html') == t.render('html')
+    assert t2.render('latex') == t.render('latex')
+    return t2
+
+@pytest.fixture
+def t():
+    t = Table(TableHeaderRow('a', 'b', 'c'),
+              (1, 2.5, 'x'), (3, 4.5, 'y & z'), (5, 6.5, u'é'))
+    t.cell(1, 0).row_span = 2
+    t.cell(2, 1).bg_colour = 'red'
+    t.cell(2, 1).text_colour = 'white'
+    t.cell(3, 2).header = True
+    return t
+
+def test_round_trip(t):
+    t2 = round_trip(t)
+    assert t2.has_header
+    assert isinstance(t2.rows[0], TableHeaderRow)
+    assert t2.cell(1, 0).row_span == 2
+    assert t2.cell(2, 1).bg_colour == 'red'
+    assert t2.cell(2, 1).text_colour == 'white'
+    assert t2.cell(3, 2).header
+    assert not t2.cell(3, 1).header
+    assert t2.cell(3, 1).value == 6.5
+    # Cells keep working after loading
+    t2.cell(1, 0).row_span = 1
+    t.cell(1, 0).row_span = 1
+    assert t2.render() == t.render()
+
+def test_columns_stored_by_type(t):
+    t2 = Table.from_bytes(t.to_bytes())
+    store = t2.rows[1]._store
+    assert [type(col).__name__ for col in store.columns] == [
+        'memoryview', 'memoryview', '_StringColumn']
+    assert len(store.cells) == 3 # Only the cells that differ from values
+
+def test_column_spans_and_ragged_rows():
+    t = Table((TableCell('wide', col_span=2), 'x'), (1, 2, 3))
+    t.append_row(TableRow(4))
+    t.append_row(TableHeaderRow(TableHeader('h', col_span=2), 'i'))
+    t2 = round_trip(t)
+    assert type(t2.cell(0, 1)).__name__ == 'SpanPlaceholder'
+    assert t2.rows[2]._slots == [4]
+
+def test_span_past_last_column():
+    t = Table(('a',), ('b',))
+    t.cell(0, 0).col_span = 2
+    t2 = round_trip(t)
+    assert t2.rows[0].column_count() == 2
+    assert t2.render('latex').startswith('\\begin{tabular}{*{2}{l}}')
+
+def test_other_values_pickled():
+    t = Table((datetime.date(2020, 1, 2), None, True), ('', 1, 2.0))
+    t2 = round_trip(t)
+    assert t2.cell(0, 0).value == datetime.date(2020, 1, 2)
+    assert t2.cell(0, 1).value is None
+
+def test_blanks_in_number_columns():
+    t = Table((1, 2.0), ('', ''), (3, 4.0))
+    t2 = round_trip(t)
+    assert [r._slots for r in t2.rows] == [[1, 2.0], ['', ''], [3, 4.0]]
+
+def test_smaller_than_pickle():
+    t = Table(*[(i, i / 7.0, 'row %d' % i) for i in range(2000)])
+    assert len(t.to_bytes()) < len(pickle.dumps(t)) * 0.6
+
+def test_dataframe_memory_mapped(tmpdir):
+    np = pytest.importorskip('numpy')
+    pd = pytest.importorskip('pandas')
+    df = pd.DataFrame({'x': np.arange(5000) / 3.0,
+                       'y': np.arange(5000, dtype=np.float32)},
+                      index=pd.Index(np.arange(5000), name='i'))
+    t = Table.from_dataframe(df)
+    t.cell(3, 1).bg_colour = 'yellow'
+    path = str(tmpdir.join('t.tabipy'))
+    t.save(path)
+    t2 = Table.load(path)
+    column = t2.rows[1]._store.columns[2]
+    assert isinstance(column, np.ndarray) and column.dtype == np.float32
+    assert not column.flags.owndata # A view of the mapped file
+    assert t2.render() == t.render()
+    assert t2.cell(3, 0).header
+
+def test_not_a_table():
+    with pytest.raises(ValueError):
+        Table.from_bytes(b'not a table at all')
+
+def test_needs_python3(monkeypatch):
+    data = Table((1, 2)).to_bytes()
+    monkeypatch.setattr(tabipy, 'PY3', False)
+    with pytest.raises(NotImplementedError):
+        Table((1, 2)).to_bytes()
+    with pytest.raises(NotImplementedError):
+        Table.from_bytes(data)
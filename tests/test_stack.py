@@ -0,0 +1,81 @@
+import warnings
+import pytest
+from tabipy import Table, TableHeaderRow, TableCell, VStack, HStack
+
+@pytest.fixture
+def a():
+    t = Table(TableHeaderRow('x', 'y'), (1, 2), (3, 4))
+    t.cell(1, 0).row_span = 2
+    return t
+
+@pytest.fixture
+def b():
+    return Table(TableHeaderRow('x', 'y'), (5, 6))
+
+def latex(t):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return t.render('latex')
+
+def test_vstack_shares_rows(a, b):
+    v = Table.vstack(a, b)
+    assert isinstance(v, VStack)
+    assert v.rows == a.rows + b.rows[1:] # The repeated header is left out
+    assert v.rows[1] is a.rows[1]
+    assert v.render().splitlines() == [
+        '<table>',
+        '<tr><th  >x</th><th  >y</th></tr>',
+        '<tr><td rowspan="2" >1</td><td  >2</td></tr>',
+        '<tr><td  >4</td></tr>',
+        '<tr><td  >5</td><td  >6</td></tr>',
+        '</table>']
+
+def test_vstack_pads_and_keeps_other_headers(a):
+    c = Table(TableHeaderRow('p', 'q', 'r'), (7, 8, 9))
+    v = Table.vstack(a, c)
+    html = v.render()
+    assert html.count('<th  >') == 5
+    assert '<tr><td  >4</td><td  ></td></tr>' in html
+    assert '\\bf x & \\bf y & \\\\\\\nhline' in latex(v)
+    assert v.to_csv().splitlines() == ['x,y,', '1,2,', ',4,', 'p,q,r',
+                                       '7,8,9']
+
+def test_hstack(a, b):
+    c = Table((7, 8, 9))
+    h = Table.hstack(a, c, b)
+    assert isinstance(h, HStack)
+    assert h.to_csv().splitlines() == ['x,y,,,,x,y', '1,2,7,8,9,5,6',
+                                       ',4,,,,,']
+    html = h.render()
+    assert html.count('<tr>') == 3
+    assert '<td rowspan="2" >1</td>' in html
+    assert latex(h).count('\\multirow{2}{*}{1}') == 1
+    assert h._leading_headers() == 1
+
+def test_nested_stacks_and_views(a, b):
+    h = Table.hstack(Table.vstack(a, b), a.page(0, 1))
+    assert h.to_csv().splitlines() == ['x,y,x,y', '1,2,1,2', ',4,,',
+                                       '5,6,,']
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        longtable = ''.join(h.iter_longtable())
+    assert longtable.split('\n')[4] == '\\endhead'
+
+def test_display_paths(a, b):
+    v = Table.vstack(a, b)
+    assert v._repr_html_() == v.render()
+    assert v._repr_latex_() == latex(v)
+    b.cell(1, 1).bg_colour = 'red'
+    assert '{background-color:red}' in v.render('html_compact')
+    with pytest.raises(TypeError):
+        v.sort_by('x')
+
+def test_rows_render_cached(a, b):
+    a._repr_html_()
+    hits = a.render_cache_info().hits
+    Table.vstack(a, b)._repr_html_()
+    assert a.render_cache_info().hits == hits + 3
+
+def test_nothing_to_stack():
+    with pytest.raises(ValueError):
+        Table.vstack()
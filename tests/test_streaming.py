@@ -0,0 +1,36 @@
+import io
+import pytest
+from tabipy import Table, TableHeaderRow
+
+@pytest.fixture
+def t():
+    "Returns a small table with a header and a row span"
+    t = Table(TableHeaderRow('a','b','c'),
+              (1,2,3),
+              (4,5,6))
+    t.cell(1,0).row_span = 2
+    return t
+
+def test_iter_html(t):
+    "The fragments join up to the normal HTML output"
+    fragments = list(t.iter_html())
+    assert len(fragments) == len(t.rows) + 2
+    assert ''.join(fragments) == t._repr_html_()
+
+def test_iter_latex(t):
+    "The fragments join up to the normal LaTeX output"
+    fragments = list(t.iter_latex())
+    assert len(fragments) == len(t.rows) + 2
+    assert ''.join(fragments) == t._repr_latex_()
+
+def test_write_to(t):
+    for fmt, expected in (('html', t._repr_html_()),
+                          ('latex', t._repr_latex_())):
+        buf = io.StringIO()
+        written = t.write_to(buf, fmt=fmt)
+        assert buf.getvalue() == expected
+        assert written == len(expected)
+
+def test_write_to_bad_format(t):
+    with pytest.raises(ValueError):
+        t.write_to(io.StringIO(), fmt='rtf')
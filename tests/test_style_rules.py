@@ -0,0 +1,130 @@
+import re
+import pytest
+from tabipy import (Table, TableCell, TableHeaderRow, Highlight, ColourScale,
+                    StripeRows)
+
+@pytest.fixture
+def t():
+    return Table(TableHeaderRow('name', 'x'),
+                 *[('r%d' % i, i) for i in range(5)])
+
+def cell_style(html, value):
+    match = re.search(r'<td  (?:style="([^"]*)")?>%s</td>' % value, html)
+    return match.group(1)
+
+def test_highlight(t):
+    t.add_style_rule(Highlight('x', above=2, bg_colour='red'))
+    html = t.render()
+    assert cell_style(html, '3') == 'background-color:red'
+    assert cell_style(html, '2') is None
+    assert cell_style(html, 'r3') is None
+    t.add_style_rule(Highlight('name', test=lambda v: v.endswith('0'),
+                               text_colour='blue'))
+    assert cell_style(t.render(), 'r0') == 'color:blue'
+
+def test_no_cells_touched(t):
+    t.add_style_rule(Highlight(1, below=3, bg_colour='red'))
+    t.render()
+    assert not any(isinstance(c, TableCell) for row in t.rows[1:]
+                   for c in row._slots)
+
+def test_cell_colours_win(t):
+    t.cell(4, 1).bg_colour = 'green'
+    t.cell(5, 1).text_colour = 'white'
+    t.add_style_rule(Highlight('x', above=2, bg_colour='red'))
+    html = t.render()
+    assert cell_style(html, '3') == 'background-color:green'
+    assert cell_style(html, '4') == 'background-color:red; color:white'
+
+def test_later_rules_win(t):
+    t.add_style_rule(Highlight('x', above=0, bg_colour='red'))
+    rule = t.add_style_rule(Highlight('x', above=3, bg_colour='blue'))
+    html = t.render()
+    assert cell_style(html, '1') == 'background-color:red'
+    assert cell_style(html, '4') == 'background-color:blue'
+    t.remove_style_rule(rule)
+    assert cell_style(t.render(), '4') == 'background-color:red'
+    t.clear_style_rules()
+    assert 'style=' not in t.render()
+
+def test_colour_scale(t):
+    t.add_style_rule(ColourScale('x', colours=('#000', '#ffffff')))
+    html = t.render()
+    assert cell_style(html, '0') == 'background-color:#000000'
+    assert cell_style(html, '4') == 'background-color:#ffffff'
+    assert cell_style(html, '2') == 'background-color:#808080'
+    # A new value changes the range for the other rows
+    t.append_row(('r5', 8))
+    html = t.render()
+    assert cell_style(html, '8') == 'background-color:#ffffff'
+    assert cell_style(html, '4') == 'background-color:#808080'
+
+def test_colour_scale_python_and_numpy_agree():
+    rule = ColourScale(0, vmin=-1, vmax=5)
+    bg, text = rule.evaluate([3, 'x', 1.5, None, -2, 7, float('nan'), 4])
+    assert text is None
+    assert [c is None for c in bg] == [False, True, False, True,
+                                       False, False, True, False]
+    assert bg[4] == rule.palette[0] and bg[5] == rule.palette[-1]
+    np = pytest.importorskip('numpy')
+    numbers = [3, 1.5, -2, 7, 4, float('nan')]
+    assert rule.evaluate(np.array(numbers))[0] == rule.evaluate(
+        numbers + ['x'])[0][:-1]
+
+def test_stripes_and_compact(t):
+    t.add_style_rule(StripeRows(bg_colour='#eee'))
+    html = t.render('html_compact')
+    striped = re.findall(r'<tr><td class="Beee">r(\d)</td>', html)
+    assert striped == ['1', '3']
+    assert '{background-color:#eee}' in html
+
+def test_changed_rules_rerender_rows(t):
+    t._repr_html_()
+    rule = t.add_style_rule(Highlight('x', above=3, bg_colour='red'))
+    assert 'background-color:red' in t._repr_html_()
+    t.remove_style_rule(rule)
+    assert 'style=' not in t._repr_html_()
+    assert t.render_cache_info().hits > 0
+
+def test_views_and_columns():
+    np = pytest.importorskip('numpy')
+    t = Table.from_array(np.arange(20.).reshape(10, 2), header=['a', 'b'])
+    t.add_style_rule(ColourScale('b', colours=('#000', '#fff')))
+    html = t.sort_by('a', reverse=True).render()
+    assert html.split('\n')[2].endswith(
+        '<td  style="background-color:#ffffff">19.0</td></tr>')
+    assert 'background' not in t.page(0, 1).render('latex')
+
+def test_columns_match_rows():
+    columns = [list(range(8)), [5, 3, 9, 1, 7, 2], ['a'] * 8]
+    rows = [[c[i] if i < len(c) else '' for c in columns] for i in range(8)]
+    by_columns = Table.from_columns(columns, header=['x', 'y', 'z'])
+    by_rows = Table(TableHeaderRow('x', 'y', 'z'), *rows)
+    for t in (by_columns, by_rows):
+        t.cell(3, 1).value = 100
+        t.cell(5, 0).bg_colour = 'blue'
+        t.append_row(TableHeaderRow('x', 'y', 'z'))
+        t.append_row((20, 0, 'b'))
+        t.add_style_rule(ColourScale('y'))
+        t.add_style_rule(Highlight('x', above=4, text_colour='red'))
+    assert by_columns.render() == by_rows.render()
+    assert by_columns.render('html_compact') == by_rows.render('html_compact')
+    assert 'color:red' in by_columns.render()
+
+def test_rules_evaluated_once_for_parallel_render(monkeypatch):
+    calls = []
+    class Counted(StripeRows):
+        def evaluate(self, values):
+            calls.append(len(values))
+            return super(Counted, self).evaluate(values)
+    big = Table(*[(i, i) for i in range(400)])
+    big.parallel_min_rows = 100
+    big.add_style_rule(Counted())
+    render_chunk = big._render_chunk
+    def chunk(*args):
+        # The styles are worked out before the chunks are handed out
+        assert big._rule_cache is not None
+        return render_chunk(*args)
+    monkeypatch.setattr(big, '_render_chunk', chunk)
+    assert big.render(workers=4) == big.render()
+    assert len(calls) == 2 # One per column
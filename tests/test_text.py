@@ -0,0 +1,86 @@
+import io
+import pytest
+from tabipy import Table, TableCell, TableHeaderRow, LiveTable
+
+@pytest.fixture
+def t():
+    t = Table(TableHeaderRow('name', 'n', 'note'),
+              ('apple', 3, 'x, "y"'), ('b', 40, 'a|b\nc'),
+              (TableCell('wide cell spanning', col_span=2), 'z'))
+    t.cell(1, 1).row_span = 2
+    return t
+
+def test_text(t):
+    assert t.to_text() == ('name   n            note\n'
+                           '-----  -----------  ------\n'
+                           'apple  3            x, "y"\n'
+                           'b                   a|b c\n'
+                           'wide cell spanning  z\n')
+    assert t.render('text') == t.to_text()
+
+def test_markdown(t):
+    assert t.to_markdown().splitlines() == [
+        '| name               | n   | note   |',
+        '| ------------------ | --- | ------ |',
+        '| apple              | 3   | x, "y" |',
+        '| b                  |     | a\\|b c |',
+        '| wide cell spanning |     | z      |']
+
+def test_markdown_without_header():
+    t = Table((1, 2), (3, 4))
+    assert t.to_markdown().splitlines()[:2] == ['|     |     |',
+                                                '| --- | --- |']
+
+def test_csv(t):
+    assert t.to_csv() == ('name,n,note\n'
+                          'apple,3,"x, ""y"""\n'
+                          'b,,"a|b\nc"\n'
+                          'wide cell spanning,,z\n')
+
+def test_formats_and_views(t):
+    t.set_format('n', '{:.1f}')
+    assert 'apple,3.0,' in t.to_csv()
+    assert t.sort_by('name').to_csv().splitlines()[1].startswith('apple')
+    t.max_rows = 2
+    pretty = pytest.importorskip('IPython.lib.pretty')
+    assert pretty.pretty(t).splitlines()[-2:] == [
+        '...   ...           ...', 'wide cell spanning  z']
+
+def test_write_to_file(t):
+    f = io.StringIO()
+    n = t.to_markdown(f)
+    assert f.getvalue() == t.to_markdown()
+    assert n == len(f.getvalue())
+
+def test_text_rendered_once(t):
+    lines = []
+    printer = type('Printer', (), {})()
+    printer.text = lines.append
+    t._repr_pretty_(printer, False)
+    assert lines == [t.to_text().rstrip('\n')]
+    info = t.render_cache_info()
+    assert (info.hits, info.misses) == (0, 4) # One pass finds the widths
+    t.to_markdown()
+    t.to_csv()
+    assert t.render_cache_info().misses == 4
+
+def test_values_converted_once():
+    calls = []
+    class Value(object):
+        def __str__(self):
+            calls.append(self)
+            return 'v'
+    t = Table(*[(Value(), Value()) for i in range(10)])
+    t.to_text()
+    assert len(calls) == 20
+    t.to_markdown()
+    assert len(calls) == 40
+
+def test_empty_table():
+    lines = []
+    printer = type('Printer', (), {})()
+    printer.text = lines.append
+    for t in (Table(), LiveTable().table):
+        t._repr_pretty_(printer, False)
+        assert t.to_text() == t.to_csv() == ''
+    assert lines == ['', '']
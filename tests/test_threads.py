@@ -0,0 +1,50 @@
+import sys
+import threading
+import warnings
+from tabipy import Table, TableHeaderRow
+
+def make_table():
+    "Returns a table with overlapping row and column spans"
+    t = Table(TableHeaderRow('a', 'b', 'c', 'd'),
+              *[(r, 'x_%d' % r, r * 1.5, '&') for r in range(60)])
+    for r in range(1, 58, 3):
+        t.cell(r, 0).row_span = 3
+        t.cell(r + 1, 1).col_span = 2
+        t.cell(r, 3).bg_colour = 'red'
+    t.set_format(2, '.2f')
+    return t
+
+def renders(t):
+    return (t._repr_html_(), t._repr_latex_(), t.page(2, 7)._repr_html_(),
+            t.page(1, 10)._repr_latex_())
+
+def test_concurrent_renders_match_serial():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = renders(make_table())
+        t = make_table()
+        before = [(c.value, c.row_span, c.col_span, c.bg_colour)
+                  for row in t.rows for c in row.cells]
+        results = []
+        def worker():
+            for i in range(20):
+                results.append(renders(t))
+                if i % 5 == 0:
+                    # Make other threads race to rebuild the cached layout too
+                    t._layout = None
+        threads = [threading.Thread(target=worker) for i in range(8)]
+        # Switch threads as often as possible to shake out races
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+    assert len(results) == 160
+    assert all(r == expected for r in results)
+    after = [(c.value, c.row_span, c.col_span, c.bg_colour)
+             for row in t.rows for c in row.cells]
+    assert after == before
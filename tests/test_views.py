@@ -0,0 +1,77 @@
+import pytest
+from tabipy import Table, TableCell, TableHeaderRow, TableView
+
+@pytest.fixture
+def t():
+    t = Table(TableHeaderRow('name', 'n'),
+              ('c', 3), ('a', 1), ('d', 4), ('b', 2), ('e', 0))
+    t.cell(3, 1).row_span = 2 # Ties d and b together
+    return t
+
+def names(view):
+    return [row._value_at(0) for row in view.rows]
+
+def test_sort_by(t):
+    view = t.sort_by('name')
+    assert isinstance(view, TableView)
+    assert names(view) == ['name', 'a', 'c', 'd', 'b', 'e']
+    assert names(t.sort_by(1)) == ['name', 'e', 'a', 'c', 'd', 'b']
+    assert names(t.sort_by('name', reverse=True)) == [
+        'name', 'e', 'd', 'b', 'c', 'a']
+    assert names(t.sort_by('name', key=lambda v: -ord(v))) == [
+        'name', 'e', 'd', 'b', 'c', 'a']
+    # The span is rendered whole inside its block
+    assert '<td rowspan="2" >4</td>' in view.render()
+    assert t.sort_by('name').render() != t.render()
+
+def test_sort_missing_last():
+    t = Table(TableHeaderRow('a', 'b'), (1, 2), (3,), (0, 5), (4, None))
+    assert names(t.sort_by('b')) == ['a', 1, 0, 3, 4]
+    assert names(t.sort_by('b', reverse=True)) == ['a', 0, 1, 3, 4]
+    assert names(t.sort_by('b', key=lambda v: -v)) == ['a', 0, 1, 3, 4]
+
+def test_no_cells_created(t):
+    t.sort_by('name').render()
+    assert not any(isinstance(c, TableCell) for c in t.rows[1]._slots)
+
+def test_filter(t):
+    assert names(t.filter(lambda v: v[1] > 2)) == ['name', 'c', 'd', 'b']
+    assert names(t.filter(lambda v: v[0] in 'ae')) == ['name', 'a', 'e']
+    # Covered positions give the spanning cell's value
+    seen = []
+    t.filter(seen.append)
+    assert ['b', 4] in seen
+
+def test_chained(t):
+    view = t.filter(lambda v: v[0] != 'c').sort_by('n', reverse=True)
+    assert names(view) == ['name', 'd', 'b', 'a', 'e']
+    assert names(t.page(0, 2).sort_by('name')) == ['name', 'a', 'c']
+
+def test_take(t):
+    view = t.take([5, 1, -1, 0])
+    assert names(view) == ['name', 'e', 'c', 'e']
+    assert view.segments == [(0, 1), (5, 6), (1, 2), (5, 6)]
+    # Taking row b alone cuts the span reaching into it
+    assert '<td  >4</td>' in t.take([4]).render()
+    assert names(t.take([2, 3])) == ['name', 'a', 'd']
+    assert t.take([2, 3]).segments == [(0, 1), (2, 4)]
+    with pytest.raises(IndexError):
+        t.take([6])
+
+def test_index_and_lookup(t):
+    index = t.index('n')
+    assert index == {3: [1], 1: [2], 4: [3, 4], 0: [5]}
+    assert t.index(1) is index
+    assert names(t.lookup('name', 'b')) == ['name', 'd', 'b']
+    assert names(t.lookup('n', 4)) == ['name', 'd', 'b']
+    assert names(t.lookup('n', 99)) == ['name']
+    t.append_row(('f', 1))
+    assert t.index('n')[1] == [2, 6]
+    t.cell(1, 1).value = 1
+    assert t.index('n')[1] == [1, 2, 6]
+
+def test_column_store_index():
+    t = Table.from_columns([list('xyzxy'), list(range(5))],
+                           header=['k', 'v'])
+    assert t.index('k') == {'x': [1, 4], 'y': [2, 5], 'z': [3]}
+    assert names(t.sort_by('k')) == ['k', 'x', 'x', 'y', 'y', 'z']